@@ -0,0 +1,24 @@
+import os
+from contextlib import contextmanager
+
+# ==========================================
+# 原子写文件：先写同目录临时文件再 rename，读者（Pages / 常驻模式下的静态服务 / 下一次运行）
+# 不会看到写了一半的文件；写入失败时删除临时文件，原文件保持不变
+# ==========================================
+
+
+@contextmanager
+def atomic_output(path, mode="w", opener=open, **kwargs):
+    # opener 可换成 gzip.open 等同签名的函数；文本模式默认 UTF-8
+    if "b" not in mode:
+        kwargs.setdefault("encoding", "utf-8")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp.{os.getpid()}"
+    try:
+        with opener(tmp, mode, **kwargs) as f:
+            yield f
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
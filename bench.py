@@ -0,0 +1,719 @@
+import argparse
+import contextlib
+import json
+import sys
+import hashlib
+import html
+import re
+import os
+import random
+import resource
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import feed_stream
+import http_cache
+import http_session
+import main
+import near_dup
+import ranking
+import replay
+import run_report
+import sharding
+import summarizer
+import textnorm
+from items import make_item
+
+# 固定时间基准，保证同一进程内桩信源内容稳定（便于 ETag 命中）
+STUB_NOW = datetime.now().astimezone()
+
+
+# ==========================================
+# 本地桩服务：按 ?delay= 参数模拟慢速信源，?drip= 每隔若干秒只发一个字节
+# ==========================================
+def make_rss(n_items, prefix="item", now=None):
+    now = now or STUB_NOW
+    entries = []
+    for i in range(n_items):
+        pub = format_datetime(now - timedelta(hours=i))
+        entries.append(
+            f"<item><title>{prefix} {i}</title>"
+            f"<link>https://example.com/{prefix}/{i}</link>"
+            f"<pubDate>{pub}</pubDate>"
+            f"<description>&lt;p&gt;{prefix} body {i}&lt;/p&gt;</description></item>"
+        )
+    return (
+        "<?xml version='1.0' encoding='utf-8'?><rss version='2.0'><channel>"
+        f"<title>{prefix}</title>{''.join(entries)}</channel></rss>"
+    ).encode("utf-8")
+
+
+class StubFeedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        delay = float(query.get("delay", ["0"])[0])
+        drip = float(query.get("drip", ["0"])[0])
+        n_items = int(query.get("n", ["10"])[0])
+        if delay:
+            time.sleep(delay)
+        body = make_rss(n_items, prefix=parsed.path.strip("/").replace("/", "-") or "feed")
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/rss+xml; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        if drip:
+            try:
+                for i in range(len(body)):
+                    self.wfile.write(body[i:i + 1])
+                    self.wfile.flush()
+                    time.sleep(drip)
+            except OSError:
+                # 客户端超时断开
+                pass
+            return
+        self.wfile.write(body)
+        with self.server.stats_lock:
+            self.server.bytes_sent += len(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_server(handler=StubFeedHandler):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    server.bytes_sent = 0
+    server.stats_lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def stub_sources(base_urls, feeds_per_host, delay):
+    # 构造与 RSS_SOURCES 同形的信源表，逐个分类轮流分配
+    sources = {cat: {} for cat in main.CATEGORY_ORDER}
+    n = 0
+    for h, base in enumerate(base_urls):
+        for i in range(feeds_per_host):
+            cat = main.CATEGORY_ORDER[n % len(main.CATEGORY_ORDER)]
+            # 每个域名里放一个更慢的信源，验证总耗时只取决于最慢者
+            d = delay * 2 if i == 0 else delay
+            sources[cat][f"stub-{h}-{i}"] = f"{base}/h{h}/f{i}?delay={d}"
+            n += 1
+    return sources
+
+
+# ==========================================
+# 基准：串行 vs 并发抓取
+# ==========================================
+def bench_fetch(args):
+    servers = [start_stub_server() for _ in range(args.hosts)]
+    sources = stub_sources([base for _, base in servers], args.feeds_per_host, args.delay)
+    time_limit = datetime.now() - timedelta(days=7)
+    total = args.hosts * args.feeds_per_host
+    main.HTTP_CACHE_ENABLED = False
+    print(f"feeds={total} hosts={args.hosts} delay={args.delay}s (slowest {args.delay * 2}s)")
+
+    for label, workers in (("serial", 1), ("concurrent", args.workers)):
+        start = time.perf_counter()
+        items, health = main.fetch_all_sources(
+            time_limit, sources=sources, max_workers=workers, per_host=args.per_host
+        )
+        elapsed = time.perf_counter() - start
+        ok = sum(1 for s in health if s["ok"])
+        print(f"{label:<11} workers={workers:<3} {elapsed:6.2f}s  items={len(items)} ok={ok}/{len(health)}")
+
+    # 逐字节滴漏的镜像：整体超时必须在截止时间附近生效，而不是等每次读取各自超时
+    start = time.perf_counter()
+    try:
+        http_session.fetch(f"{servers[0][1]}/drip?drip={args.drip}", timeout=args.drip_timeout)
+        error = "completed"
+    except (TimeoutError, OSError) as e:
+        error = type(e).__name__
+    elapsed = time.perf_counter() - start
+    bounded = elapsed <= args.drip_timeout + 2 * args.drip + 0.5
+    print(
+        f"drip        {args.drip}s/byte timeout={args.drip_timeout:g}s  {elapsed:6.2f}s  {error}  "
+        f"{'bounded' if bounded else 'OVERRAN'}"
+    )
+
+    for server, _ in servers:
+        server.shutdown()
+    if not bounded:
+        sys.exit(1)
+
+
+# ==========================================
+# 基准：冷启动 vs 条件请求命中缓存
+# ==========================================
+def bench_http_cache(args):
+    servers = [start_stub_server() for _ in range(args.hosts)]
+    sources = stub_sources([base for _, base in servers], args.feeds_per_host, args.delay)
+    for cat in sources:
+        for name, url in sources[cat].items():
+            sources[cat][name] = f"{url}&n={args.items}"
+    time_limit = datetime.now() - timedelta(days=7)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        http_cache.HTTP_CACHE_DIR = os.path.join(tmp, "http")
+        for label in ("cold", "warm"):
+            before = sum(server.bytes_sent for server, _ in servers)
+            start = time.perf_counter()
+            items, health = main.fetch_all_sources(time_limit, sources=sources)
+            elapsed = time.perf_counter() - start
+            sent = sum(server.bytes_sent for server, _ in servers) - before
+            hits = sum(1 for s in health if s["cache_hit"])
+            print(f"{label:<5} {elapsed:6.2f}s  body_bytes={sent:<9} cache_hits={hits}/{len(health)} items={len(items)}")
+
+    for server, _ in servers:
+        server.shutdown()
+
+
+# ==========================================
+# 基准：近似重复聚类规模曲线
+# ==========================================
+def synthetic_stories(n, dup_ratio=0.3, seed=7):
+    rng = random.Random(seed)
+    vocab = [f"w{i}" for i in range(5000)]
+    base_ts = int(time.time())
+    items = []
+    stories = []
+    for i in range(n):
+        if stories and rng.random() < dup_ratio:
+            words, ts = rng.choice(stories)
+            words = list(words)
+            # 改写约 15% 的词，模拟不同媒体对同一事件的表述差异
+            for _ in range(max(1, len(words) // 7)):
+                words[rng.randrange(len(words))] = rng.choice(vocab)
+        else:
+            words = [rng.choice(vocab) for _ in range(40)]
+            ts = base_ts - rng.randrange(7 * 86400)
+            stories.append((words, ts))
+        items.append(
+            {
+                "id": f"s{i}",
+                "source": f"source-{i % 17}",
+                "link": f"https://example.com/{i}",
+                "title": " ".join(words[:10]),
+                "raw_summary": " ".join(words[10:]),
+                "ts": ts + rng.randrange(3600),
+            }
+        )
+    return items
+
+
+def bench_near_dup(args):
+    for n in args.sizes:
+        items = synthetic_stories(n)
+        start = time.perf_counter()
+        clustered = near_dup.cluster_items(items, lambda x: f"{x['title']} {x['raw_summary']}")
+        elapsed = time.perf_counter() - start
+        merged = sum(len(x.get("related", [])) for x in clustered)
+        print(f"n={n:<7} {elapsed:6.2f}s  {elapsed / n * 1e6:6.1f}us/item  cards={len(clustered)} merged={merged}")
+
+
+# ==========================================
+# 基准：流式渲染 vs 整页拼接（每个规模在独立子进程中测峰值 RSS）
+# ==========================================
+def synthetic_render_items(n, seed=3):
+    rng = random.Random(seed)
+    base_ts = int(time.time())
+    items = []
+    for i in range(n):
+        items.append(
+            {
+                "id": f"r{i:08d}",
+                "category": main.CATEGORY_ORDER[i % len(main.CATEGORY_ORDER)],
+                "source": f"source-{i % 23}",
+                "title": f"Synthetic headline {i} about core updates & AI Overviews",
+                "link": f"https://example.com/post/{i}",
+                "ts": base_ts - rng.randrange(30 * 86400),
+                "date_str": "2026-01-01",
+                "summary": "摘要" * 60,
+                "is_video": i % 11 == 0,
+            }
+        )
+    items.sort(key=lambda x: x["ts"], reverse=True)
+    return items
+
+
+def render_worker(n, mode, path):
+    items = synthetic_render_items(n)
+    health = [{"category": "SEO 动态", "source": "s", "url": "u", "ok": True, "count": 1, "error": ""}]
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if mode == "stream":
+        main.render_dashboard(items, health, output_path=path, max_cards=None)
+    else:
+        chunks = []
+        main.write_dashboard(chunks.append, items, health, max_cards=None)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("".join(chunks))
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return elapsed, peak, peak - base_rss, os.path.getsize(path)
+
+
+def bench_render(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "index.html")
+        for n in args.sizes:
+            for mode in ("in-memory", "stream"):
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    elapsed, peak_kb, delta_kb, size = pool.submit(render_worker, n, mode, path).result()
+                print(
+                    f"n={n:<7} {mode:<9} {elapsed:6.2f}s  peak_rss={peak_kb / 1024:7.1f}MB "
+                    f"(+{delta_kb / 1024:.1f}MB while rendering)  html={size / 1e6:6.1f}MB"
+                )
+
+
+# ==========================================
+# 基准：条目内存占用（字典 + 排序副本去重 vs slots 条目 + 原地去重 + 释放原文）
+# ==========================================
+def legacy_dedup_by_link(items):
+    # 旧版 main.dedup_by_link，作为对照
+    unique_by_link = {}
+    for item in sorted(items, key=lambda x: x["ts"], reverse=True):
+        if item["link"] not in unique_by_link:
+            unique_by_link[item["link"]] = item
+    return list(unique_by_link.values())
+
+
+def memory_rows(n, raw_kb, seed=5):
+    rng = random.Random(seed)
+    base_ts = int(time.time())
+    para = "<p>Search <strong>engine</strong> news &amp; <a href='https://example.com'>analysis</a></p>\n"
+    repeat = max(1, raw_kb * 1024 // len(para))
+    for i in range(n):
+        # 约 5% 的条目与其他信源链接重复
+        link = f"https://example.com/post/{rng.randrange(n) if i % 20 == 0 else i}"
+        ts = base_ts - rng.randrange(30 * 86400)
+        yield (
+            f"m{i:08d}",
+            main.CATEGORY_ORDER[i % len(main.CATEGORY_ORDER)],
+            f"source-{i % 23}",
+            f"Synthetic headline {i}",
+            link,
+            ts,
+            datetime.fromtimestamp(ts).strftime("%Y-%m-%d"),
+            f"<div id='m{i}'>" + para * repeat + "</div>",
+        )
+
+
+def memory_worker(n, raw_kb, mode):
+    import tracemalloc
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    if mode == "dict":
+        keys = ("id", "category", "source", "title", "link", "ts", "date_str", "raw_summary")
+        items = [dict(zip(keys, row), summary=None, is_video=False) for row in memory_rows(n, raw_kb)]
+        items = legacy_dedup_by_link(items)
+        for item in items:
+            item["summary"] = "摘要" * 60
+    else:
+        items = [make_item(*row) for row in memory_rows(n, raw_kb)]
+        main.dedup_by_link(items)
+        for item in items:
+            item["summary"] = "摘要" * 60
+        main.release_raw_bodies(items)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(items), elapsed, current, peak
+
+
+def bench_memory(args):
+    for n in args.sizes:
+        for mode in ("dict", "item"):
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                kept, elapsed, current, peak = pool.submit(memory_worker, n, args.raw_kb, mode).result()
+            print(
+                f"n={n:<7} {mode:<5} {elapsed:6.2f}s (traced)  peak={peak / 1e6:7.1f}MB  "
+                f"after summarize={current / 1e6:7.1f}MB  items={kept}"
+            )
+
+
+# ==========================================
+# 基准：本周重点排序（堆 Top-K vs 全量排序）
+# ==========================================
+def bench_rank(args):
+    ranker = ranking.Ranker()
+    for n in args.sizes:
+        items = synthetic_render_items(n)
+        now = time.time()
+        start = time.perf_counter()
+        picks = ranker.top_k(items, main.CATEGORY_ORDER, now=now)
+        heap_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        since = now - ranker.config["window_days"] * 86400
+        full = {}
+        for cat in main.CATEGORY_ORDER:
+            scored = [(ranker.score(i, now), i["ts"]) for i in items if i["category"] == cat and i["ts"] >= since]
+            full[cat] = sorted(scored, reverse=True)[:ranker.config["top_k"]]
+        sort_s = time.perf_counter() - start
+        same = all(
+            [ranker.score(i, now) for i in picks[cat]] == [s for s, _ in full[cat]] for cat in main.CATEGORY_ORDER
+        )
+        print(
+            f"n={n:<7} heap top-k {heap_s:6.3f}s ({n / heap_s:10,.0f}/s)  "
+            f"full sort {sort_s:6.3f}s  same_picks={same}"
+        )
+
+
+# ==========================================
+# 基准：正文清洗一致性与吞吐
+# ==========================================
+def legacy_normalize_text(raw):
+    # 旧版 main.normalize_text，作为一致性基准
+    if not raw:
+        return ""
+    if isinstance(raw, list):
+        raw = raw[0].get("value", "")
+    text = re.sub("<.*?>", "", str(raw))
+    text = html.unescape(text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return text
+
+
+def normalize_corpus(seed=11, fuzz=400):
+    rng = random.Random(seed)
+    para = (
+        "<p class='lead'>Google&#8217;s <a href=\"https://x.com/?a=1&amp;b=2\">March core update</a> "
+        "is rolling out&nbsp;&mdash; 搜索&amp;流量 &lt;GEO&gt; &#x4e2d;文</p>\n"
+    )
+    corpus = [
+        "",
+        "plain text only",
+        [{"value": "<b>list</b> &amp; value"}],
+        "<div\nclass='x'>tag across newline</div>",
+        "&am<b>p; entity split by tag",
+        "unclosed < bracket and & alone &amp",
+        para * 400,
+        para.replace("\n", " ") * 400,
+        ("<figure><img src='a.png' alt='x'/><figcaption>caption</figcaption></figure>" * 300) + "tail text",
+    ]
+    pieces = ["<", ">", "&", "amp;", "#39;", "\n", " ", "a", "中", "<b>", "</b>", "&nbsp;", "\t", "lt", ";",
+              "#x4e2d;", "&amp", "\u3000", "word ", "<br/>\n"]
+    for _ in range(fuzz):
+        corpus.append("".join(rng.choice(pieces) for _ in range(rng.randrange(0, 3000))))
+    return corpus
+
+
+def bench_normalize(args):
+    limits = (None, 60, 600, 1200)
+    corpus = normalize_corpus()
+    mismatches = 0
+    for raw in corpus:
+        expected = legacy_normalize_text(raw)
+        for limit in limits:
+            got = textnorm.normalize_text(raw, limit=limit)
+            if got != (expected if limit is None else expected[:limit]):
+                mismatches += 1
+    print(f"corpus={len(corpus)} x limits={len(limits)} mismatches={mismatches}")
+
+    # 大条目吞吐：模拟 Search Engine Land 这类几十 KB 的 HTML 正文
+    para = "<p>Search <strong>engine</strong> news &amp; <a href='https://example.com'>analysis</a> &#8217;</p>\n"
+    entries = [f"<div id='e{i}'>" + para * (args.kb * 1024 // len(para)) + "</div>" for i in range(args.entries)]
+    size_mb = sum(len(e) for e in entries) / 1e6
+    for label, fn in (
+        ("legacy", lambda e: legacy_normalize_text(e)[:1200]),
+        ("textnorm cold", lambda e: textnorm.normalize_text(e, limit=1200)),
+        ("textnorm warm", lambda e: textnorm.normalize_text(e, limit=1200)),
+    ):
+        if label == "textnorm cold":
+            textnorm._cache.clear()
+        start = time.perf_counter()
+        for e in entries:
+            fn(e)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<14} {elapsed:6.3f}s  {size_mb / elapsed:8.1f} MB/s  ({args.entries} x {args.kb}KB)")
+    if mismatches:
+        sys.exit(1)
+
+
+# ==========================================
+# 基准：大归档信源的解析耗时与内存峰值（feedparser 全量 vs 流式提前截止）
+# ==========================================
+def large_feed(n_entries, kb, now=None):
+    # 模拟 36Kr 这类按时间倒序、每条带大段 content:encoded 的归档
+    now = now or STUB_NOW
+    para = "<p>36氪 AI 资讯：搜索 &amp; 生成式引擎优化的行业观察，<a href='https://example.com'>原文</a></p>"
+    body = para * max(1, kb * 1024 // len(para.encode("utf-8")))
+    entries = []
+    for i in range(n_entries):
+        pub = format_datetime(now - timedelta(hours=6 * i))
+        entries.append(
+            f"<item><title>archive {i}</title><link>https://example.com/archive/{i}</link>"
+            f"<pubDate>{pub}</pubDate><description>{html.escape(para)}</description>"
+            f"<content:encoded><![CDATA[{body}]]></content:encoded></item>"
+        )
+    return (
+        "<?xml version='1.0' encoding='utf-8'?>"
+        "<rss version='2.0' xmlns:content='http://purl.org/rss/1.0/modules/content/'><channel>"
+        f"<title>archive</title>{''.join(entries)}</channel></rss>"
+    ).encode("utf-8")
+
+
+def parse_worker(path, mode, cutoff_days):
+    with open(path, "rb") as f:
+        body = f.read()
+    cutoff = datetime.now() - timedelta(days=cutoff_days) if mode == "stream" else None
+    parser_mode = "feedparser" if mode == "feedparser" else "stream"
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    entries, _, stopped = feed_stream.parse_feed(body, {}, cutoff=cutoff, compact=main.compact_entry, mode=parser_mode)
+    elapsed = time.perf_counter() - start
+    delta = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base_rss
+    return elapsed, delta, len(entries), stopped
+
+
+def bench_parse(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        feeds = []
+        if args.fixtures:
+            index = replay.load_feed_index(args.fixtures)
+            for url, meta in index.items():
+                feeds.append((url, os.path.join(replay.feeds_dir(args.fixtures), f"{meta['key']}.body")))
+        else:
+            path = os.path.join(tmp, "archive.xml")
+            with open(path, "wb") as f:
+                f.write(large_feed(args.entries, args.kb))
+            feeds.append((f"synthetic {args.entries} x {args.kb}KB", path))
+        for name, path in feeds:
+            print(f"{name}  ({os.path.getsize(path) / 1e6:.1f}MB)")
+            # 每种模式一个新进程，ru_maxrss 才能反映各自的峰值
+            for mode in ("feedparser", "stream-full", "stream"):
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    elapsed, delta_kb, n, stopped = pool.submit(parse_worker, path, mode, args.days).result()
+                note = " (stopped at cutoff)" if stopped else ""
+                print(f"    {mode:<11} {elapsed:7.3f}s  +{delta_kb / 1024:7.1f}MB peak  entries={n}{note}")
+
+
+# ==========================================
+# 基准：端到端回放（合成语料 100 ~ 50k 条，按阶段统计吞吐）
+# ==========================================
+def rss_from_items(items):
+    entries = []
+    for item in items:
+        pub = format_datetime(datetime.fromtimestamp(item["ts"]).astimezone())
+        entries.append(
+            f"<item><title>{html.escape(item['title'])}</title><link>{item['link']}</link>"
+            f"<pubDate>{pub}</pubDate><description>{html.escape('<p>' + item['raw_summary'] + '</p>')}</description></item>"
+        )
+    return (
+        "<?xml version='1.0' encoding='utf-8'?><rss version='2.0'><channel><title>bench</title>"
+        f"{''.join(entries)}</channel></rss>"
+    ).encode("utf-8")
+
+
+def isolate_caches(tmp):
+    main.use_cache_dir(tmp)
+    run_report.RUN_REPORT_PATH = os.path.join(tmp, "run_report.json")
+
+
+def record_synthetic_fixtures(n, feeds, fixtures_dir):
+    stories = synthetic_stories(n)
+    sources = {cat: {} for cat in main.CATEGORY_ORDER}
+    per_feed = max(1, n // feeds)
+    for f in range(feeds):
+        chunk = stories[f * per_feed:(f + 1) * per_feed] if f < feeds - 1 else stories[f * per_feed:]
+        url = f"https://bench-{f % 7}.example/feed/{f}.xml"
+        cat = main.CATEGORY_ORDER[f % len(main.CATEGORY_ORDER)]
+        sources[cat][f"bench-feed-{f}"] = url
+        replay.record_feed(url, rss_from_items(chunk), {"content-type": "application/rss+xml"}, fixtures_dir)
+    return sources
+
+
+def fake_summary(messages):
+    return "合成摘要：" + "模型回放输出" * 20
+
+
+def run_e2e(n, feeds):
+    with tempfile.TemporaryDirectory() as tmp:
+        isolate_caches(tmp)
+        fixtures_dir = os.path.join(tmp, "fixtures")
+        main.RSS_SOURCES = record_synthetic_fixtures(n, feeds, fixtures_dir)
+        replay.REPLAY_MODE = "replay"
+        replay.FIXTURES_DIR = fixtures_dir
+        replay._stub.update(server=None, base=None)
+        main.build_ai_client = lambda: replay.FakeClient(fixtures_dir, synthesize=fake_summary)
+        summarizer.LLM_RPM = summarizer.LLM_TPM = 0
+        summarizer.LLM_BUDGET_CALLS = summarizer.LLM_BUDGET_TOKENS = 10 ** 12
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(open(os.devnull, "w")):
+            report = main.fetch_data(output_path=os.path.join(tmp, "index.html"))
+        total = time.perf_counter() - start
+        if replay._stub["server"] is not None:
+            replay._stub["server"].shutdown()
+    return total, report
+
+
+def comparable_html(path):
+    # 随运行时刻变化的下次抓取时间在 status.json 里，页面本身应逐字节一致
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def run_sharded_compare(n, feeds, processes):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        fixtures_dir = os.path.join(tmp, "fixtures")
+        main.RSS_SOURCES = record_synthetic_fixtures(n, feeds, fixtures_dir)
+        replay.REPLAY_MODE = "replay"
+        replay.FIXTURES_DIR = fixtures_dir
+        main.build_ai_client = lambda: replay.FakeClient(fixtures_dir, synthesize=fake_summary)
+        summarizer.LLM_RPM = summarizer.LLM_TPM = 0
+        summarizer.LLM_BUDGET_CALLS = summarizer.LLM_BUDGET_TOKENS = 10 ** 12
+        for label, run in (
+            ("single", lambda out: main.fetch_data(output_path=out)),
+            (f"pool x{processes}", lambda out: sharding.run_pool(processes, output_path=out)),
+        ):
+            run_dir = os.path.join(tmp, label.replace(" ", "_"))
+            os.makedirs(run_dir)
+            isolate_caches(run_dir)
+            replay._stub.update(server=None, base=None)
+            out = os.path.join(run_dir, "index.html")
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(open(os.devnull, "w")):
+                report = run(out)
+            results[label] = (time.perf_counter() - start, report, comparable_html(out))
+            if replay._stub["server"] is not None:
+                replay._stub["server"].shutdown()
+    return results
+
+
+def bench_shards(args):
+    different = 0
+    for n in args.sizes:
+        results = run_sharded_compare(n, args.feeds, args.processes)
+        (_, (_, _, expected)), *others = results.items()
+        for label, (total, report, page) in results.items():
+            same = "identical" if page == expected else "DIFFERENT"
+            different += page != expected
+            print(
+                f"n={n:<6} feeds={args.feeds:<4} {label:<9} total={total:6.2f}s  "
+                f"fetch={report['stages'].get('fetch', 0):.2f}s  html {same}"
+            )
+    if different:
+        sys.exit(1)
+
+
+def bench_e2e(args):
+    results = {}
+    for n in args.sizes:
+        total, report = run_e2e(n, args.feeds)
+        entries = report["counters"].get("entries_parsed", n)
+        stages = report["stages"]
+        results[str(n)] = {"total": total, "stages": stages}
+        per_stage = " ".join(
+            f"{name}={secs:.2f}s({entries / secs if secs else 0:,.0f}/s)" for name, secs in stages.items()
+        )
+        print(f"n={n:<6} total={total:6.2f}s  {per_stage}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = []
+        for n, res in results.items():
+            for name, secs in res["stages"].items():
+                base = baseline.get(n, {}).get("stages", {}).get(name)
+                # 太短的阶段计时噪声大，不参与比较
+                if base and base >= 0.05 and secs > base * args.tolerance:
+                    regressions.append(f"n={n} {name}: {base:.2f}s -> {secs:.2f}s")
+        for line in regressions:
+            print(f"[REGRESSION] {line}")
+        if regressions:
+            sys.exit(1)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="seo-news-monitor benchmarks")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("fetch", help="serial vs concurrent fetch against local stub feeds")
+    p.add_argument("--hosts", type=int, default=5)
+    p.add_argument("--feeds-per-host", type=int, default=4)
+    p.add_argument("--delay", type=float, default=0.5)
+    p.add_argument("--workers", type=int, default=main.FETCH_MAX_WORKERS * 2)
+    p.add_argument("--per-host", type=int, default=4)
+    p.add_argument("--drip", type=float, default=0.5, help="seconds between bytes for the slow-drip stub")
+    p.add_argument("--drip-timeout", type=float, default=2.0)
+    p.set_defaults(func=bench_fetch)
+
+    p = sub.add_parser("http-cache", help="cold vs warm (304) fetch against local stub feeds")
+    p.add_argument("--hosts", type=int, default=5)
+    p.add_argument("--feeds-per-host", type=int, default=4)
+    p.add_argument("--delay", type=float, default=0.0)
+    p.add_argument("--items", type=int, default=200)
+    p.set_defaults(func=bench_http_cache)
+
+    p = sub.add_parser("near-dup", help="near-duplicate clustering time vs item count")
+    p.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000, 50000])
+    p.set_defaults(func=bench_near_dup)
+
+    p = sub.add_parser("render", help="render time and peak RSS for synthetic dashboards")
+    p.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    p.set_defaults(func=bench_render)
+
+    p = sub.add_parser("shards", help="single-process vs sharded process-pool run on replayed feeds")
+    p.add_argument("--sizes", type=int, nargs="+", default=[2000, 20000])
+    p.add_argument("--feeds", type=int, default=200)
+    p.add_argument("--processes", type=int, default=4)
+    p.set_defaults(func=bench_shards)
+
+    p = sub.add_parser("memory", help="dict items vs slotted items peak memory")
+    p.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    p.add_argument("--raw-kb", type=int, default=1)
+    p.set_defaults(func=bench_memory)
+
+    p = sub.add_parser("rank", help="weekly insights ranking throughput")
+    p.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    p.set_defaults(func=bench_rank)
+
+    p = sub.add_parser("normalize", help="normalize_text fixture check and large-entry throughput")
+    p.add_argument("--entries", type=int, default=500)
+    p.add_argument("--kb", type=int, default=40)
+    p.set_defaults(func=bench_normalize)
+
+    p = sub.add_parser("parse", help="feedparser vs streaming parse on large feeds")
+    p.add_argument("--entries", type=int, default=400)
+    p.add_argument("--kb", type=int, default=30)
+    p.add_argument("--days", type=int, default=7, help="cutoff window for the streaming path")
+    p.add_argument("--fixtures", help="benchmark recorded feeds from a REPLAY_MODE=record fixtures dir")
+    p.set_defaults(func=bench_parse)
+
+    p = sub.add_parser("e2e", help="offline end-to-end replay over synthetic recorded feeds")
+    p.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 50000])
+    p.add_argument("--feeds", type=int, default=20)
+    p.add_argument("--json", help="write per-stage timings to this file")
+    p.add_argument("--baseline", help="compare against a previous --json output")
+    p.add_argument("--tolerance", type=float, default=2.0)
+    p.set_defaults(func=bench_e2e)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,133 @@
+import os
+import json
+import time
+import signal
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import http_session
+import main
+import scheduler
+
+# ==========================================
+# 常驻模式：进程内按间隔刷新看板，模型客户端、缓存与连接跨轮复用
+# 本地状态接口 GET /status 返回最近一次运行指标，GET /healthz 用于存活探测
+# ==========================================
+SERVE_INTERVAL = int(os.environ.get("SERVE_INTERVAL_MINUTES", "30")) * 60
+# 两轮刷新的最短间隔，避免信源陆续到期时频繁重渲染
+SERVE_MIN_INTERVAL = int(os.environ.get("SERVE_MIN_INTERVAL_MINUTES", "5")) * 60
+STATUS_HOST = os.environ.get("STATUS_HOST", "127.0.0.1")
+STATUS_PORT = int(os.environ.get("STATUS_PORT", "8765"))
+
+_lock = threading.Lock()
+
+
+def new_status(output_path, interval):
+    return {
+        "pid": os.getpid(),
+        "started_at": round(time.time(), 3),
+        "output": output_path,
+        "interval": interval,
+        "runs": 0,
+        "failures": 0,
+        "last_error": "",
+        "next_run_at": None,
+        "last_run": None,
+    }
+
+
+class StatusHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/healthz":
+            with _lock:
+                ok = self.server.status["runs"] > 0 and not self.server.status["last_error"]
+            self.send_body(200 if ok else 503, b"ok\n" if ok else b"not ready\n", "text/plain")
+            return
+        if path in ("/", "/status"):
+            with _lock:
+                body = json.dumps(self.server.status, ensure_ascii=False, indent=2).encode("utf-8")
+            self.send_body(200, body, "application/json; charset=utf-8")
+            return
+        self.send_body(404, b"not found\n", "text/plain")
+
+    def send_body(self, code, body, content_type):
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_status_server(status, host=None, port=None):
+    server = ThreadingHTTPServer((host or STATUS_HOST, STATUS_PORT if port is None else port), StatusHandler)
+    server.daemon_threads = True
+    server.status = status
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def refresh_delay(ctx, interval, min_interval):
+    # 启用调度时在下一个信源到期前醒来，但不早于最短间隔、不晚于刷新间隔
+    if not main.scheduling_enabled():
+        return interval
+    wait = scheduler.next_wakeup(ctx["schedule"], main.RSS_SOURCES, time.time())
+    return min(max(wait, min_interval), interval)
+
+
+def serve(output_path="index.html", interval=None, min_interval=None, host=None, port=None):
+    interval = SERVE_INTERVAL if interval is None else interval
+    min_interval = SERVE_MIN_INTERVAL if min_interval is None else min_interval
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+
+    status = new_status(output_path, interval)
+    server = start_status_server(status, host, port)
+    print(f"[INFO] status endpoint on http://{server.server_address[0]}:{server.server_address[1]}/status")
+    ctx = main.open_context()
+    try:
+        while not stop.is_set():
+            try:
+                report = main.fetch_data(output_path=output_path, ctx=ctx)
+                with _lock:
+                    status["runs"] += 1
+                    status["last_error"] = ""
+                    status["last_run"] = report
+            except Exception as e:
+                # 单轮失败不退出，下一轮照常刷新
+                print(f"[WARN] refresh failed: {e}")
+                with _lock:
+                    status["failures"] += 1
+                    status["last_error"] = str(e)[:200]
+            delay = refresh_delay(ctx, interval, min_interval)
+            with _lock:
+                status["next_run_at"] = round(time.time() + delay, 3)
+            print(f"[INFO] next refresh in {delay / 60:.1f} min")
+            stop.wait(delay)
+    finally:
+        main.close_context(ctx)
+        http_session.close_session()
+        server.shutdown()
+    print("[INFO] daemon stopped")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="seo-news-monitor daemon")
+    parser.add_argument("--output", default="index.html")
+    parser.add_argument("--interval", type=float, default=SERVE_INTERVAL / 60, help="refresh interval (minutes)")
+    parser.add_argument(
+        "--min-interval", type=float, default=SERVE_MIN_INTERVAL / 60, help="minimum gap between refreshes (minutes)"
+    )
+    parser.add_argument("--host", default=STATUS_HOST)
+    parser.add_argument("--port", type=int, default=STATUS_PORT)
+    args = parser.parse_args()
+    serve(args.output, args.interval * 60, args.min_interval * 60, args.host, args.port)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,149 @@
+import io
+import os
+from datetime import datetime
+
+import feedparser
+from feedparser.datetimes import _parse_date
+from lxml import etree
+
+# ==========================================
+# 流式解析：lxml iterparse 逐条读取 RSS / Atom 条目，只取后续流程用到的字段
+# 按时间倒序排列的信源遇到连续过期条目即停止；格式不规范时退回 feedparser
+# ==========================================
+# stream：优先流式解析；feedparser：总是完整解析（对照与排障用）
+FEED_PARSER = os.environ.get("FEED_PARSER", "stream").strip().lower()
+# 倒序信源连续出现多少条过期条目后停止读取（容忍少量乱序）
+STREAM_STALE_LIMIT = 3
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+RSS1_NS = "http://purl.org/rss/1.0/"
+ENTRY_TAGS = ("item", f"{{{RSS1_NS}}}item", f"{{{ATOM_NS}}}entry")
+# 只认这些命名空间下的字段，避免 media:title 之类的扩展字段覆盖正文字段
+FIELD_NAMESPACES = frozenset(
+    (
+        "",
+        ATOM_NS,
+        RSS1_NS,
+        "http://purl.org/atom/ns#",
+        "http://purl.org/dc/elements/1.1/",
+        "http://purl.org/dc/terms/",
+        "http://purl.org/rss/1.0/modules/content/",
+    )
+)
+
+# 条目字段 -> 本地标签名；同一字段按顺序取第一个非空值
+LINK_TAGS = ("link",)
+DATE_TAGS = ("pubDate", "published", "issued", "date", "updated", "modified")
+SUMMARY_TAGS = ("description", "summary", "encoded", "content")
+WANTED_TAGS = frozenset(("title", "guid") + LINK_TAGS + DATE_TAGS + SUMMARY_TAGS)
+
+
+def split_tag(tag):
+    # 注释、处理指令等节点的 tag 不是字符串
+    if not isinstance(tag, str):
+        return None, ""
+    if tag.startswith("{"):
+        ns, name = tag[1:].split("}", 1)
+        return ns, name
+    return "", tag
+
+
+def element_text(el):
+    # xhtml 类型的 Atom 字段内容在子元素里，其余直接取文本
+    if len(el):
+        return "".join(el.itertext()).strip()
+    return (el.text or "").strip()
+
+
+def entry_link(el):
+    text = (el.text or "").strip()
+    if text:
+        return text
+    # Atom：优先 rel=alternate（缺省 rel 视同 alternate）
+    if el.get("rel", "alternate") == "alternate":
+        return el.get("href") or ""
+    return ""
+
+
+def compact_element(el):
+    fields = {}
+    for child in el:
+        ns, name = split_tag(child.tag)
+        if name not in WANTED_TAGS or ns not in FIELD_NAMESPACES:
+            continue
+        if name in LINK_TAGS:
+            if not fields.get("link"):
+                fields["link"] = entry_link(child)
+        elif name == "guid":
+            # 与 feedparser 一致：没有 link 时用永久链接形式的 guid
+            if child.get("isPermaLink", "true") != "false":
+                fields.setdefault("guid", element_text(child))
+        elif name not in fields:
+            fields[name] = element_text(child)
+    if not fields.get("link") and fields.get("guid", "").startswith(("http://", "https://")):
+        fields["link"] = fields["guid"]
+    dt = None
+    for name in DATE_TAGS:
+        if fields.get(name):
+            dt = _parse_date(fields[name])
+            if dt:
+                break
+    summary = ""
+    for name in SUMMARY_TAGS:
+        if fields.get(name):
+            summary = fields[name]
+            break
+    return {
+        "link": fields.get("link") or None,
+        "title": fields.get("title") or None,
+        "published_parsed": list(dt[:6]) if dt else None,
+        "summary": summary,
+    }
+
+
+def stream_entries(body, cutoff=None, stale_limit=None):
+    # 返回 (条目列表, 是否提前停止)；XML 不规范时抛出 etree.XMLSyntaxError
+    stale_limit = STREAM_STALE_LIMIT if stale_limit is None else stale_limit
+    entries = []
+    stale = 0
+    last_dt = None
+    ordered = True
+    parser = etree.iterparse(
+        io.BytesIO(body), events=("end",), tag=ENTRY_TAGS, resolve_entities=False, no_network=True, huge_tree=True
+    )
+    for _, el in parser:
+        entry = compact_element(el)
+        # 释放已处理条目，内存占用与单条条目大小相当，而非整份归档
+        el.clear()
+        parent = el.getparent()
+        while parent is not None and el.getprevious() is not None:
+            del parent[0]
+        entries.append(entry)
+        if cutoff is None or not entry["published_parsed"]:
+            continue
+        dt = datetime(*entry["published_parsed"])
+        if last_dt is not None and dt > last_dt:
+            ordered = False
+        last_dt = dt
+        stale = stale + 1 if dt < cutoff else 0
+        if ordered and stale >= stale_limit:
+            return entries, True
+    return entries, False
+
+
+def parse_feed(body, headers=None, cutoff=None, compact=None, mode=None):
+    # 返回 (条目列表, 错误信息, 是否提前停止)；compact 为 feedparser 条目的精简函数
+    mode = FEED_PARSER if mode is None else mode
+    if mode == "stream":
+        try:
+            entries, stopped = stream_entries(body, cutoff)
+        except etree.XMLSyntaxError:
+            entries, stopped = [], False
+        if entries:
+            return entries, "", stopped
+    # 不规范或无法识别的文档交给 feedparser（宽松解析并给出 bozo 错误）
+    feed = feedparser.parse(body, response_headers=headers or {})
+    error = ""
+    if getattr(feed, "bozo", False) and getattr(feed, "bozo_exception", None):
+        error = str(feed.bozo_exception)[:120]
+    return [compact(entry) for entry in feed.entries], error, False
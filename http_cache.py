@@ -0,0 +1,62 @@
+import os
+import json
+import hashlib
+
+from atomic_io import atomic_output
+
+# ==========================================
+# 信源 HTTP 缓存：按 URL 保存 ETag / Last-Modified、原始响应体与解析后的条目
+# ==========================================
+CACHE_DIR = os.environ.get("CACHE_DIR", ".cache")
+HTTP_CACHE_DIR = os.path.join(CACHE_DIR, "http")
+
+
+def _paths(url, cache_dir=None):
+    base = cache_dir or HTTP_CACHE_DIR
+    key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    return os.path.join(base, f"{key}.json"), os.path.join(base, f"{key}.body")
+
+
+def load_entry(url, cache_dir=None):
+    meta_path, _ = _paths(url, cache_dir)
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    # 条目缺失的旧缓存视为未命中，重新完整下载
+    return meta if isinstance(meta.get("entries"), list) else None
+
+
+def save_entry(url, body, headers, entries, error="", cache_dir=None):
+    etag = headers.get("etag")
+    last_modified = headers.get("last-modified")
+    meta_path, body_path = _paths(url, cache_dir)
+    try:
+        # 无校验头的信源无法做条件请求，只保存解析后的条目（调度跳过时复用），不保存原始响应体
+        if etag or last_modified:
+            with atomic_output(body_path, "wb") as f:
+                f.write(body)
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_type": headers.get("content-type"),
+            "error": error,
+            "entries": entries,
+        }
+        with atomic_output(meta_path) as f:
+            json.dump(meta, f, ensure_ascii=False)
+    except OSError as e:
+        print(f"[WARN] http cache write failed: {url} -> {e}")
+
+
+def conditional_headers(entry):
+    headers = {}
+    if not entry:
+        return headers
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
@@ -0,0 +1,79 @@
+import os
+import time
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+
+# ==========================================
+# 信源下载：进程内共享 keep-alive 连接池，协商压缩，限制超时与响应体大小
+# ==========================================
+FETCH_CONNECT_TIMEOUT = float(os.environ.get("FETCH_CONNECT_TIMEOUT", "5"))
+# 解压后的响应体上限，超出即中止（防止异常大的归档或压缩炸弹）
+FETCH_MAX_BYTES = int(float(os.environ.get("FETCH_MAX_MB", "10")) * 1024 * 1024)
+# 连接池按域名缓存的数量；每个域名的连接数与 FETCH_PER_HOST 一致
+POOL_HOSTS = 32
+CHUNK_SIZE = 64 * 1024
+# 由 urllib3 按已安装的解码库生成：gzip, deflate，装了 brotli / zstandard 时追加 br / zstd
+ACCEPT_ENCODING = make_headers(accept_encoding=True)["accept-encoding"]
+# 响应体已解压，交给 feedparser 和缓存时去掉与原始传输相关的头
+TRANSPORT_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+_lock = threading.Lock()
+_session = {"session": None}
+
+
+def get_session(per_host=2):
+    with _lock:
+        if _session["session"] is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=max(1, per_host), max_retries=0)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+            _session["session"] = session
+        return _session["session"]
+
+
+def close_session():
+    with _lock:
+        if _session["session"] is not None:
+            _session["session"].close()
+            _session["session"] = None
+
+
+def fetch(url, headers=None, timeout=20.0, connect_timeout=None, max_bytes=None, per_host=2):
+    # 返回 (状态码, 解压后的响应体, 响应头, 线上传输字节数)；304 时响应体为 None
+    connect_timeout = FETCH_CONNECT_TIMEOUT if connect_timeout is None else connect_timeout
+    max_bytes = FETCH_MAX_BYTES if max_bytes is None else max_bytes
+    # 整体超时：慢速逐字节返回的镜像也不会拖住整个抓取阶段
+    deadline = time.monotonic() + timeout
+    resp = get_session(per_host).get(
+        url, headers=headers, timeout=(min(connect_timeout, timeout), timeout), stream=True
+    )
+    with resp:
+        if resp.status_code == 304:
+            return 304, None, {}, 0
+        resp.raise_for_status()
+        declared = resp.headers.get("content-length", "")
+        if declared.isdigit() and int(declared) > max_bytes:
+            raise ValueError(f"body too large: {int(declared)} bytes")
+        chunks = []
+        size = 0
+        # read1 有数据即返回，不等凑满一整块；每次读取后检查截止时间，逐字节滴漏的响应也在超时附近中止
+        while True:
+            chunk = resp.raw.read1(CHUNK_SIZE, decode_content=True)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise ValueError(f"body too large: over {max_bytes} bytes")
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"timed out after {timeout:g}s")
+            chunks.append(chunk)
+        wire_bytes = resp.raw.tell()
+        resp_headers = {k.lower(): v for k, v in resp.headers.items() if k.lower() not in TRANSPORT_HEADERS}
+    # 单块响应直接复用该 bytes 对象，多块只拼接一次
+    body = chunks[0] if len(chunks) == 1 else b"".join(chunks)
+    return resp.status_code, body, resp_headers, wire_bytes
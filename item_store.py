@@ -0,0 +1,119 @@
+import os
+import time
+import sqlite3
+
+from http_cache import CACHE_DIR
+from items import make_item
+
+# ==========================================
+# 条目库：跨运行增量保存条目与摘要，看板直接从库中渲染
+# ==========================================
+ITEM_STORE_PATH = os.path.join(CACHE_DIR, "items.db")
+# 库中保留的天数（与看板最大的 30 天筛选一致）
+ITEM_RETENTION_DAYS = int(os.environ.get("ITEM_RETENTION_DAYS", "30"))
+
+COLUMNS = ["id", "category", "source", "title", "link", "ts", "date_str", "raw_summary", "summary", "is_video"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id TEXT PRIMARY KEY,
+    category TEXT NOT NULL,
+    source TEXT NOT NULL,
+    title TEXT NOT NULL,
+    link TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    date_str TEXT NOT NULL,
+    raw_summary TEXT,
+    summary TEXT,
+    is_video INTEGER NOT NULL DEFAULT 0,
+    first_seen INTEGER NOT NULL,
+    last_seen INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_items_link ON items(link);
+CREATE INDEX IF NOT EXISTS idx_items_category_ts ON items(category, ts);
+CREATE INDEX IF NOT EXISTS idx_items_ts ON items(ts);
+"""
+
+
+def open_store(path=None):
+    path = path or ITEM_STORE_PATH
+    if path != ":memory:":
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def upsert_items(conn, items, now=None):
+    now = int(now or time.time())
+    rows = [
+        (
+            item["id"],
+            item["category"],
+            item["source"],
+            item["title"],
+            item["link"],
+            item["ts"],
+            item["date_str"],
+            str(item.get("raw_summary") or ""),
+            item.get("summary"),
+            int(bool(item.get("is_video"))),
+            now,
+            now,
+            int(bool(item.get("undated"))),
+            int(bool(item.get("undated"))),
+        )
+        for item in items
+    ]
+    # 已存在的条目保留 first_seen；标题或正文变化时清空旧摘要以便重新生成；
+    # 没有发布时间的条目每次抓取的 ts 都是当下，保留库中首次见到时的 ts / date_str，避免每轮都变
+    conn.executemany(
+        """
+        INSERT INTO items (id, category, source, title, link, ts, date_str, raw_summary, summary, is_video,
+                           first_seen, last_seen)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            summary = CASE
+                WHEN items.title = excluded.title AND items.raw_summary = excluded.raw_summary
+                THEN COALESCE(excluded.summary, items.summary)
+                ELSE excluded.summary
+            END,
+            title = excluded.title,
+            link = excluded.link,
+            ts = CASE WHEN ? THEN items.ts ELSE excluded.ts END,
+            date_str = CASE WHEN ? THEN items.date_str ELSE excluded.date_str END,
+            raw_summary = excluded.raw_summary,
+            is_video = excluded.is_video,
+            last_seen = excluded.last_seen
+        """,
+        rows,
+    )
+    conn.commit()
+    return len(rows)
+
+
+def save_summaries(conn, items):
+    conn.executemany(
+        "UPDATE items SET summary = ? WHERE id = ?",
+        [(item["summary"], item["id"]) for item in items],
+    )
+    conn.commit()
+
+
+def load_window(conn, since_ts):
+    cur = conn.execute(
+        f"SELECT {', '.join(COLUMNS)} FROM items WHERE ts >= ? ORDER BY ts DESC, id",
+        (int(since_ts),),
+    )
+    return [make_item(**row) for row in cur]
+
+
+def prune(conn, retention_days=None, now=None):
+    retention_days = ITEM_RETENTION_DAYS if retention_days is None else retention_days
+    cutoff = int(now or time.time()) - retention_days * 86400
+    cur = conn.execute("DELETE FROM items WHERE ts < ?", (cutoff,))
+    conn.commit()
+    return cur.rowcount
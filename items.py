@@ -0,0 +1,74 @@
+import sys
+
+# ==========================================
+# 条目模型：__slots__ 类代替十个键的字典，分类 / 信源 / 日期字符串驻留共享
+# 保留 item["key"] / item.get / item.pop 写法，流水线各模块对字典与 Item 一视同仁
+# 手写 __slots__ 而非 @dataclass(slots=True)，后者需要 Python 3.10+
+# ==========================================
+
+
+class Item:
+    __slots__ = (
+        "id", "category", "source", "title", "link", "ts", "date_str", "raw_summary", "summary", "is_video", "related",
+        "body_text", "undated",
+    )
+
+    def __init__(
+        self, id, category, source, title, link, ts, date_str, raw_summary="", summary=None, is_video=False,
+        related=None, body_text=None, undated=False,
+    ):
+        self.id = id
+        self.category = category
+        self.source = source
+        self.title = title
+        self.link = link
+        self.ts = ts
+        self.date_str = date_str
+        self.raw_summary = raw_summary
+        self.summary = summary
+        self.is_video = is_video
+        self.related = related
+        # 释放原始 HTML 后保留的截断纯文本（已清洗，不可再次清洗）
+        self.body_text = body_text
+        # 信源没有给出发布时间，ts 取自抓取时刻（条目库中保留首次见到的时间）
+        self.undated = undated
+
+    def __repr__(self):
+        return f"Item(id={self.id!r}, source={self.source!r}, title={self.title!r})"
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        setattr(self, key, value)
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None)
+        return default if value is None else value
+
+    def pop(self, key, default=None):
+        value = self.get(key, default)
+        setattr(self, key, None)
+        return value
+
+
+def make_item(
+    id, category, source, title, link, ts, date_str, raw_summary="", summary=None, is_video=False, undated=False
+):
+    # 同一分类 / 信源 / 日期的上万条目共用一份字符串
+    return Item(
+        id,
+        sys.intern(category),
+        sys.intern(source),
+        title,
+        link,
+        int(ts),
+        sys.intern(date_str),
+        raw_summary or "",
+        summary,
+        bool(is_video),
+        undated=bool(undated),
+    )
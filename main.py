@@ -1,10 +1,32 @@
 import os
 import re
+import json
 import html
+import string
 import hashlib
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from urllib.parse import urlparse
 
-import feedparser
+import feed_stream
+import http_cache
+import http_session
+import item_store
+import near_dup
+import ranking
+import render_cache
+import replay
+import run_report
+import scheduler
+import summarizer
+import summary_cache
+from atomic_io import atomic_output
+from items import make_item
+from textnorm import normalize_text
 
 try:
     from openai import OpenAI
@@ -66,24 +88,43 @@ RSS_SOURCES = {
     },
 }
 
-
-def normalize_text(raw):
-    if not raw:
-        return ""
-    if isinstance(raw, list):
-        raw = raw[0].get("value", "")
-    text = re.sub("<.*?>", "", str(raw))
-    text = html.unescape(text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
+# ==========================================
+# 2) 抓取参数（可通过环境变量覆盖）
+# ==========================================
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X)"
+# 全局并发上限 / 单域名并发上限 / 单个信源总耗时上限（秒）
+FETCH_MAX_WORKERS = int(os.environ.get("FETCH_MAX_WORKERS", "8"))
+FETCH_PER_HOST = int(os.environ.get("FETCH_PER_HOST", "2"))
+FETCH_TIMEOUT = float(os.environ.get("FETCH_TIMEOUT", "20"))
+# 条件请求缓存（ETag / Last-Modified），设置 HTTP_CACHE=0 关闭
+HTTP_CACHE_ENABLED = os.environ.get("HTTP_CACHE", "1") != "0"
+# 增量条目库（SQLite），设置 ITEM_STORE=0 时退回每次重建 7 天窗口
+ITEM_STORE_ENABLED = os.environ.get("ITEM_STORE", "1") != "0"
+# 近似重复聚类，设置 NEAR_DUP=0 关闭
+NEAR_DUP_ENABLED = os.environ.get("NEAR_DUP", "1") != "0"
+# 按信源自适应轮询（未到期的信源本次跳过），设置 SCHEDULER=0 时每次抓取全部信源
+SCHEDULER_ENABLED = os.environ.get("SCHEDULER", "1") != "0"
+# 看板展示窗口（天），覆盖页面上 3 / 7 / 30 天筛选
+DASHBOARD_DAYS = int(os.environ.get("DASHBOARD_DAYS", "30"))
+# inline 模式下每个分类每天平均可渲染的卡片数；上限随展示窗口放大，30 天筛选在高频分类下也能看到整个窗口
+CARDS_PER_DAY = int(os.environ.get("CARDS_PER_DAY", "20"))
+# 每个分类最多渲染的卡片数（None 表示不限）
+CARDS_PER_CATEGORY = CARDS_PER_DAY * DASHBOARD_DAYS
+RENDER_BUFFER_SIZE = 1 << 16
+# inline：卡片全部内嵌到 index.html；shards：输出轻量页面 + data/ 下按分类按天的 JSON 分片
+RENDER_MODE = os.environ.get("RENDER_MODE", "inline")
+SHARD_DIR_NAME = "data"
+# 每次运行都会变化的内容（下次抓取时间、运行趋势）写到页面旁的小文件，由页面加载时填入
+STATUS_FILE_NAME = "status.json"
+# 聚类与排序使用的正文长度；摘要完成后条目只保留这么长的纯文本
+BODY_KEEP_CHARS = 600
 
 
 def fallback_cn_summary(item, target_len=120):
-    base = normalize_text(item.get("raw_summary", "")) or item["title"]
     source = item["source"]
     prefix = f"来自{source}："
     body_limit = max(60, target_len - len(prefix))
-    body = base[:body_limit]
+    body = normalize_text(item.get("raw_summary", ""), limit=body_limit) or item["title"][:body_limit]
     tail = "。点击卡片可查看原文。" if not body.endswith(("。", "！", "？")) else "点击卡片可查看原文。"
     summary = f"{prefix}{body}{tail}"
     if len(summary) < 100:
@@ -92,46 +133,122 @@ def fallback_cn_summary(item, target_len=120):
 
 
 def build_ai_client():
+    if replay.REPLAY_MODE == "replay":
+        return replay.wrap_client(None)
     api_key = os.environ.get("OPENAI_API_KEY")
     if not api_key or OpenAI is None:
         return None
     base_url = (os.environ.get("OPENAI_BASE_URL") or "https://free.aipro.love/v1").strip()
-    return OpenAI(api_key=api_key, base_url=base_url)
+    return replay.wrap_client(OpenAI(api_key=api_key, base_url=base_url))
+
+
+# 修改提示词或模型时递增，使旧摘要缓存自动失效
+PROMPT_VERSION = "v1"
+
+
+SUMMARY_MODEL = "claude-3-5-sonnet"
+SUMMARY_SYSTEM_PROMPT = "你是严谨的中文SEO策略编辑。"
 
 
-def generate_ai_summary(client, item):
-    if client is None:
-        return fallback_cn_summary(item)
+# 提示词中正文片段的字符上限
+PROMPT_TEXT_LIMIT = 1200
 
-    model = "claude-3-5-sonnet"
-    raw = normalize_text(item.get("raw_summary", ""))[:1200]
-    prompt = (
-        "你是SEO与DTC家具行业研究编辑。请从SEO增长、内容策略、"
-        "搜索流量获取、家具垂类转化机会的视角总结下列资讯。"
-        "输出100-150字中文精简摘要，信息密度高、可执行、无营销话术，"
-        "只输出纯文本，不要使用项目符号。\n\n"
+SUMMARY_INSTRUCTION = (
+    "你是SEO与DTC家具行业研究编辑。请从SEO增长、内容策略、"
+    "搜索流量获取、家具垂类转化机会的视角总结下列资讯。"
+    "输出100-150字中文精简摘要，信息密度高、可执行、无营销话术，"
+    "只输出纯文本，不要使用项目符号。"
+)
+
+
+def format_summary_source(item):
+    raw = normalize_text(item.get("raw_summary", ""), limit=PROMPT_TEXT_LIMIT)
+    return (
         f"来源：{item['source']}\n"
         f"分类：{item['category']}\n"
         f"标题：{item['title']}\n"
         f"正文片段：{raw or '无正文片段'}\n"
     )
-    try:
-        resp = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": "你是严谨的中文SEO策略编辑。"},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.2,
-        )
-        text = (resp.choices[0].message.content or "").strip()
-        text = re.sub(r"\s+", "", text)
-        if len(text) < 95 or len(text) > 170:
-            return None
-        return text[:150]
-    except Exception as e:
-        print(f"[WARN] AI summary failed: {item['title'][:60]} -> {e}")
+
+
+def build_summary_prompt(item):
+    return f"{SUMMARY_INSTRUCTION}\n\n{format_summary_source(item)}"
+
+
+def build_batch_summary_prompt(items):
+    blocks = "\n".join(f"[id: {item['id']}]\n{format_summary_source(item)}" for item in items)
+    return (
+        f"{SUMMARY_INSTRUCTION}\n"
+        f"下面共有{len(items)}条资讯，请逐条分别总结，每条摘要要求同上。"
+        '只输出一个JSON数组，格式为 [{"id": "条目id", "summary": "摘要"}]，不要输出其他内容。\n\n'
+        f"{blocks}"
+    )
+
+
+def clean_ai_summary(text):
+    text = re.sub(r"\s+", "", (text or "").strip())
+    if len(text) < 95 or len(text) > 170:
         return None
+    return text[:150]
+
+
+def estimate_summary_tokens(item):
+    # 粗略估算：中文约 1 字 1 token，另加输出预留
+    return len(SUMMARY_SYSTEM_PROMPT) + len(build_summary_prompt(item)) + 300
+
+
+def request_ai_summary(client, item):
+    # API 错误直接抛出，由摘要阶段决定是否重试
+    resp = client.chat.completions.create(
+        model=SUMMARY_MODEL,
+        messages=[
+            {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+            {"role": "user", "content": build_summary_prompt(item)},
+        ],
+        temperature=0.2,
+    )
+    usage = getattr(resp, "usage", None)
+    tokens = getattr(usage, "total_tokens", 0) or 0
+    return clean_ai_summary(resp.choices[0].message.content), tokens
+
+
+def estimate_batch_summary_tokens(items):
+    return len(SUMMARY_SYSTEM_PROMPT) + len(build_batch_summary_prompt(items)) + 300 * len(items)
+
+
+def parse_batch_summaries(text, items):
+    text = (text or "").strip()
+    start, end = text.find("["), text.rfind("]")
+    if start < 0 or end < start:
+        return {}
+    try:
+        rows = json.loads(text[start:end + 1])
+    except ValueError:
+        return {}
+    wanted = {item["id"] for item in items}
+    results = {}
+    for row in rows if isinstance(rows, list) else []:
+        if not isinstance(row, dict) or row.get("id") not in wanted:
+            continue
+        summary = clean_ai_summary(str(row.get("summary") or ""))
+        if summary is not None:
+            results[row["id"]] = summary
+    return results
+
+
+def request_ai_summary_batch(client, items):
+    # 未返回或未通过 95-170 字校验的条目由摘要阶段单独重试
+    resp = client.chat.completions.create(
+        model=SUMMARY_MODEL,
+        messages=[
+            {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+            {"role": "user", "content": build_batch_summary_prompt(items)},
+        ],
+        temperature=0.2,
+    )
+    usage = getattr(resp, "usage", None)
+    tokens = getattr(usage, "total_tokens", 0) or 0
+    return parse_batch_summaries(resp.choices[0].message.content, items), tokens
 
 
 def parse_entry_date(entry, now):
@@ -141,7 +258,66 @@ def parse_entry_date(entry, now):
     return now
 
 
-def parse_feed_items(category, source, url, time_limit):
+def download_feed(url, timeout=FETCH_TIMEOUT, cached=None):
+    # 返回 (响应体, 响应头, 线上传输字节数)；经共享连接池下载并自动解压
+    req_headers = {"User-Agent": USER_AGENT}
+    req_headers.update(http_cache.conditional_headers(cached))
+    code, body, headers, wire_bytes = http_session.fetch(
+        replay.resolve_url(url), headers=req_headers, timeout=timeout, per_host=FETCH_PER_HOST
+    )
+    if code == 304:
+        if not cached:
+            raise ValueError("unexpected 304 without cached entry")
+        # 未变更：返回 None，由调用方复用缓存
+        return None, {}, 0
+    if replay.REPLAY_MODE == "record":
+        replay.record_feed(url, body, headers)
+    return body, headers, wire_bytes
+
+
+def compact_entry(entry):
+    # 只保留后续流程需要的字段，便于写入 HTTP 缓存
+    dt = entry.get("published_parsed") or entry.get("updated_parsed")
+    return {
+        "link": entry.get("link"),
+        "title": entry.get("title"),
+        "published_parsed": list(dt[:6]) if dt else None,
+        "summary": entry.get("summary") or entry.get("description", ""),
+    }
+
+
+def load_feed_entries(url, timeout=FETCH_TIMEOUT, use_cache=None, offline=False, cutoff=None):
+    metrics = {"bytes": 0, "wire_bytes": 0, "entries": 0, "parse_s": 0.0, "stopped_early": False}
+    if offline:
+        # 未到期的信源不发请求，只复用缓存里上次解析好的条目（没有则为空）
+        cached = http_cache.load_entry(url) or {"entries": []}
+        metrics["entries"] = len(cached["entries"])
+        return cached["entries"], cached.get("error", ""), False, metrics
+
+    use_cache = HTTP_CACHE_ENABLED if use_cache is None else use_cache
+    if replay.REPLAY_MODE:
+        # 录制 / 回放时总是完整下载，避免 304 跳过原文
+        use_cache = False
+    cached = http_cache.load_entry(url) if use_cache else None
+    body, headers, metrics["wire_bytes"] = download_feed(url, timeout=timeout, cached=cached)
+    if body is None:
+        # 304：直接复用上次解析好的条目，跳过 feedparser
+        metrics["entries"] = len(cached["entries"])
+        return cached["entries"], cached.get("error", ""), True, metrics
+
+    start = time.perf_counter()
+    # 流式解析到 cutoff 之前的条目即停；不规范的文档退回 feedparser
+    entries, error, metrics["stopped_early"] = feed_stream.parse_feed(
+        body, headers, cutoff=cutoff, compact=compact_entry
+    )
+    metrics.update(bytes=len(body), entries=len(entries), parse_s=round(time.perf_counter() - start, 4))
+    if use_cache or scheduling_enabled():
+        # 调度跳过信源时靠这份条目展示上次结果，关闭 HTTP 缓存或信源无校验头时也要保存
+        http_cache.save_entry(url, body, headers, entries, error)
+    return entries, error, False, metrics
+
+
+def parse_feed_items(category, source, url, time_limit, timeout=FETCH_TIMEOUT, offline=False):
     results = []
     status = {
         "category": category,
@@ -150,14 +326,29 @@ def parse_feed_items(category, source, url, time_limit):
         "ok": False,
         "count": 0,
         "error": "",
+        "cache_hit": False,
+        "bytes": 0,
+        "wire_bytes": 0,
+        "entries": 0,
+        "parse_s": 0.0,
+        "stopped_early": False,
+        "elapsed": 0.0,
+        "skipped": offline,
+        "post_interval": None,
     }
+    start = time.perf_counter()
     try:
-        feed = feedparser.parse(url, agent="Mozilla/5.0 (Macintosh; Intel Mac OS X)")
-        if getattr(feed, "bozo", False) and getattr(feed, "bozo_exception", None):
-            status["error"] = str(feed.bozo_exception)[:120]
+        entries, status["error"], status["cache_hit"], metrics = load_feed_entries(
+            url, timeout=timeout, offline=offline, cutoff=time_limit
+        )
+        status.update(metrics)
         now = datetime.now()
-        for entry in feed.entries:
+        post_times = []
+        for entry in entries:
             p_date = parse_entry_date(entry, now)
+            if p_date is not now:
+                # 只用带发布时间的条目估算发文间隔
+                post_times.append(p_date.timestamp())
             if p_date < time_limit:
                 continue
             link = (entry.get("link") or "").strip()
@@ -167,26 +358,83 @@ def parse_feed_items(category, source, url, time_limit):
             uid_seed = f"{category}|{source}|{link}"
             uid = hashlib.md5(uid_seed.encode("utf-8")).hexdigest()[:16]
             results.append(
-                {
-                    "id": uid,
-                    "category": category,
-                    "source": source,
-                    "title": title,
-                    "link": link,
-                    "ts": int(p_date.timestamp()),
-                    "date_str": p_date.strftime("%Y-%m-%d"),
-                    "raw_summary": entry.get("summary") or entry.get("description", ""),
-                    "is_video": "youtube" in url.lower(),
-                }
+                make_item(
+                    id=uid,
+                    category=category,
+                    source=source,
+                    title=title,
+                    link=link,
+                    ts=p_date.timestamp(),
+                    date_str=p_date.strftime("%Y-%m-%d"),
+                    raw_summary=entry.get("summary") or "",
+                    is_video="youtube" in url.lower(),
+                    undated=p_date is now,
+                )
             )
         status["count"] = len(results)
         status["ok"] = len(results) > 0 and not status["error"]
+        status["post_interval"] = scheduler.post_interval(post_times, now.timestamp())
     except Exception as e:
         status["error"] = str(e)[:120]
         print(f"[WARN] fetch failed: {source} -> {e}")
+    status["elapsed"] = round(time.perf_counter() - start, 4)
     return results, status
 
 
+def fetch_all_sources(
+    time_limit,
+    sources=None,
+    max_workers=FETCH_MAX_WORKERS,
+    per_host=FETCH_PER_HOST,
+    timeout=FETCH_TIMEOUT,
+    skip=frozenset(),
+):
+    sources = RSS_SOURCES if sources is None else sources
+    jobs = [
+        (category, source, url)
+        for category in CATEGORY_ORDER
+        for source, url in sources.get(category, {}).items()
+    ]
+    # 每个域名一个信号量，避免同一镜像（如 rsshub.app）被并发打爆
+    by_host = {}
+    for idx, (_, _, url) in enumerate(jobs):
+        if url in skip:
+            continue
+        by_host.setdefault(urlparse(url).netloc.lower(), []).append(idx)
+    host_slots = {host: threading.BoundedSemaphore(max(1, per_host)) for host in by_host}
+
+    # 按域名轮转提交，避免同域名任务排在队首占满工作线程
+    submit_order = []
+    queues = list(by_host.values())
+    while queues:
+        submit_order.extend(q.pop(0) for q in queues)
+        queues = [q for q in queues if q]
+
+    def run(job):
+        category, source, url = job
+        with host_slots[urlparse(url).netloc.lower()]:
+            return parse_feed_items(category, source, url, time_limit, timeout=timeout)
+
+    all_data = []
+    source_health = []
+    if not jobs:
+        return all_data, source_health
+    results = [None] * len(jobs)
+    # 跳过的信源只读本地缓存，不占用抓取线程
+    for idx, (category, source, url) in enumerate(jobs):
+        if url in skip:
+            results[idx] = parse_feed_items(category, source, url, time_limit, offline=True)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(submit_order) or 1))) as pool:
+        futures = {idx: pool.submit(run, jobs[idx]) for idx in submit_order}
+        for idx, fut in futures.items():
+            results[idx] = fut.result()
+    # 结果与健康状态仍按 CATEGORY_ORDER 顺序输出
+    for items, status in results:
+        all_data.extend(items)
+        source_health.append(status)
+    return all_data, source_health
+
+
 def inject_x_fallback_cards(all_data, time_limit):
     has_x = any(i["category"] == "X 社交动态" for i in all_data)
     if has_x:
@@ -194,6 +442,8 @@ def inject_x_fallback_cards(all_data, time_limit):
     now = datetime.now()
     if now < time_limit:
         return
+    # 入口卡片固定在当天零点：同一天内多次运行卡片不变，看板内容未变时可以跳过重写
+    day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
     fallback_profiles = {
         "Aleyda Solis (X)": "https://x.com/Aleyda",
         "Lily Ray (X)": "https://x.com/lilyraynyc",
@@ -202,31 +452,30 @@ def inject_x_fallback_cards(all_data, time_limit):
     for source, link in fallback_profiles.items():
         uid = hashlib.md5(f"x-fallback-{source}".encode("utf-8")).hexdigest()[:16]
         all_data.append(
-            {
-                "id": uid,
-                "category": "X 社交动态",
-                "source": source,
-                "title": f"{source} 最新动态入口",
-                "link": link,
-                "ts": int(now.timestamp()),
-                "date_str": now.strftime("%Y-%m-%d"),
-                "raw_summary": "当前未拉取到可用RSS条目，已提供个人主页作为动态入口。",
-                "summary": "当前未拉取到可用RSS条目，已提供该专家的X主页入口，便于你直接查看最新观点与实时讨论。",
-                "is_video": False,
-            }
+            make_item(
+                id=uid,
+                category="X 社交动态",
+                source=source,
+                title=f"{source} 最新动态入口",
+                link=link,
+                ts=day_start.timestamp(),
+                date_str=day_start.strftime("%Y-%m-%d"),
+                raw_summary="当前未拉取到可用RSS条目，已提供个人主页作为动态入口。",
+                summary="当前未拉取到可用RSS条目，已提供该专家的X主页入口，便于你直接查看最新观点与实时讨论。",
+                is_video=False,
+            )
         )
 
 
-def build_weekly_insights(items):
-    by_cat = {cat: [] for cat in CATEGORY_ORDER}
-    for item in items[:40]:
-        by_cat[item["category"]].append(item)
+def build_weekly_insights(items, now=None):
+    # 按相关度（关键词、信源权重、时间衰减）挑选每个分类的重点条目
+    picks_by_cat = ranking.Ranker().top_k(items, CATEGORY_ORDER, now=now)
 
     blocks = []
     for cat in CATEGORY_ORDER:
-        if not by_cat[cat]:
+        picks = picks_by_cat[cat]
+        if not picks:
             continue
-        picks = by_cat[cat][:3]
         links = "；".join(
             [f"<a href='{p['link']}' target='_blank'>{html.escape(p['title'])}</a>" for p in picks]
         )
@@ -241,6 +490,16 @@ def build_weekly_insights(items):
     return "".join(blocks)
 
 
+def build_related_html(item):
+    related = item.get("related")
+    if not related:
+        return ""
+    links = " · ".join(
+        f"<a href='{r['link']}' target='_blank'>{html.escape(r['source'])}</a>" for r in related
+    )
+    return f"<div class='related-sources'>同题报道：{links}</div>"
+
+
 def build_card_html(item):
     video_tag = "<div class='video-badge'>▶ VIDEO</div>" if item["is_video"] else ""
     return f"""
@@ -252,6 +511,7 @@ def build_card_html(item):
         </div>
         <h3>{html.escape(item['title'])}</h3>
         <p>{html.escape(item['summary'])}</p>
+        {build_related_html(item)}
         <div class='card-footer'>
             <button class='action-btn btn-read' onclick="toggleRead('{item['id']}', this)">Mark Read</button>
             <a href='{item['link']}' target='_blank' class='btn-primary'>Read Full →</a>
@@ -260,28 +520,93 @@ def build_card_html(item):
     """
 
 
-def build_health_table(source_health):
+def build_trend_table(run_history, limit=10):
+    if not run_history:
+        return ""
     rows = []
-    for item in source_health:
-        badge = "✅ 正常" if item["ok"] else "⚠️ 异常"
-        count = item["count"]
-        err = html.escape(item["error"] or "-")
+    for run in reversed(run_history[-limit:]):
+        stages = run.get("stages", {})
+        started = datetime.fromtimestamp(run["started_at"]).strftime("%m-%d %H:%M")
         rows.append(
             f"""
+                        <tr>
+                            <td>{started}</td>
+                            <td>{run.get('total', 0):.1f}s</td>
+                            <td>{stages.get('fetch', 0):.1f}s</td>
+                            <td>{stages.get('summarize', 0):.1f}s</td>
+                            <td>{stages.get('render', 0):.2f}s</td>
+                            <td>{run.get('bytes', 0) / 1024:.0f} KB</td>
+                            <td>{run.get('cache_hits', 0)}</td>
+                            <td>{run.get('llm_calls', 0)}</td>
+                            <td>{run.get('items', 0)}</td>
+                        </tr>
+            """
+        )
+    return f"""
+            <section class='health-box'>
+                <div class='box-header'>📈 运行趋势（最近 {len(rows)} 次）</div>
+                <table class='health-table'>
+                    <thead>
+                        <tr>
+                            <th>运行时间</th>
+                            <th>总耗时</th>
+                            <th>抓取</th>
+                            <th>摘要</th>
+                            <th>渲染</th>
+                            <th>下载量</th>
+                            <th>304 命中</th>
+                            <th>LLM 调用</th>
+                            <th>条目</th>
+                        </tr>
+                    </thead>
+                    <tbody>{''.join(rows)}</tbody>
+                </table>
+            </section>"""
+
+
+def build_health_row(item):
+    if item.get("skipped"):
+        badge = "⏸️ 未到期"
+    else:
+        badge = "✅ 正常" if item["ok"] else "⚠️ 异常"
+    if item.get("cache_hit"):
+        badge += "（304 缓存）"
+    if item.get("failures", 0) > 1:
+        badge += f"（连续失败 {item['failures']} 次）"
+    count = item["count"]
+    err = html.escape(item["error"] or "-")
+    url = html.escape(item.get("url") or "")
+    return f"""
             <tr>
                 <td>{html.escape(item['category'])}</td>
                 <td>{html.escape(item['source'])}</td>
                 <td>{badge}</td>
                 <td>{count}</td>
+                <td class='next-poll' data-url='{url}'>-</td>
                 <td class='error-cell'>{err}</td>
             </tr>
             """
-        )
-    return "".join(rows)
 
 
-def render_dashboard(all_data, source_health):
-    style = """
+def health_row_key(item):
+    fields = ("category", "source", "url", "ok", "skipped", "cache_hit", "failures", "count", "error")
+    return render_cache.digest([RENDER_CACHE_VERSION, "health"] + [item.get(f) for f in fields])
+
+
+def build_health_table(source_health, cache=None):
+    if cache is None:
+        return "".join(build_health_row(item) for item in source_health)
+    # 每行按自身字段哈希复用上次渲染结果
+    return "".join(
+        render_cache.fragment(cache, health_row_key(item), lambda item=item: build_health_row(item))
+        for item in source_health
+    )
+
+
+# ==========================================
+# 3) 看板模板（导入时预先切分，渲染时逐段流式写出）
+# ==========================================
+DASHBOARD_STYLE = """
     <style>
         :root { --sidebar-w: 280px; --bg: #f4f6f8; --card-bg: #ffffff; --primary: #2563eb; --text: #1e293b; --text-light: #64748b; }
         body { margin: 0; font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif; background: var(--bg); color: var(--text); display: flex; height: 100vh; overflow: hidden; }
@@ -324,10 +649,12 @@ def render_dashboard(all_data, source_health):
         .health-table th, .health-table td { border-bottom: 1px solid #f1f5f9; padding: 8px 6px; text-align: left; vertical-align: top; }
         .health-table th { color: #64748b; font-weight: 700; }
         .error-cell { max-width: 420px; color: #ef4444; word-break: break-all; }
+        .related-sources { font-size: 0.78rem; color: #94a3b8; margin: -6px 0 12px 0; line-height: 1.5; }
+        .related-sources a { color: var(--text-light); text-decoration: none; border-bottom: 1px solid #cbd5e1; }
     </style>
     """
 
-    js = """
+DASHBOARD_JS = """
     <script>
         let db = JSON.parse(localStorage.getItem('seo_dashboard_v6') || '{"read":[]}');
         function save() { localStorage.setItem('seo_dashboard_v6', JSON.stringify(db)); }
@@ -369,34 +696,148 @@ def render_dashboard(all_data, source_health):
     </script>
     """
 
-    nav_links = "".join(
-        [f"<a href='#{cat}' class='nav-item'>{CATEGORY_ICON.get(cat, '⚡')} {cat}</a>" for cat in CATEGORY_ORDER]
-    )
-
-    insights_html = build_weekly_insights(all_data)
-    health_html = build_health_table(source_health)
+# 分片模式：页面只带清单，卡片按筛选窗口按需拉取分片并在滚动到可见时渲染
+SHARD_JS = """
+    <script>
+        const MANIFEST = __MANIFEST__;
+        const PAGE_SIZE = 24;
+        let db = JSON.parse(localStorage.getItem('seo_dashboard_v6') || '{"read":[]}');
+        const readSet = new Set(db.read);
+        const loaders = {};
+        let observer = null;
+        function save() { localStorage.setItem('seo_dashboard_v6', JSON.stringify(db)); }
+        function toggleRead(id, btn) {
+            if (!readSet.has(id)) {
+                readSet.add(id);
+                db.read.push(id);
+                const card = document.getElementById(id);
+                if (card) card.classList.add('is-read');
+                btn.innerText = '已读';
+                save();
+            }
+        }
+        function esc(s) {
+            return String(s).replace(/[&<>"']/g, c => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#x27;'}[c]));
+        }
+        function buildCard(item) {
+            const read = readSet.has(item.id);
+            const card = document.createElement('article');
+            card.className = 'card card-item' + (read ? ' is-read' : '');
+            card.id = item.id;
+            card.dataset.ts = item.ts;
+            const related = (item.related || []).map(r => `<a href='${esc(r.link)}' target='_blank'>${esc(r.source)}</a>`).join(' · ');
+            card.innerHTML = `
+                ${item.is_video ? "<div class='video-badge'>▶ VIDEO</div>" : ''}
+                <div class='card-meta'>
+                    <span class='source-tag'>${esc(item.source)}</span>
+                    <span class='date'>${esc(item.date_str)}</span>
+                </div>
+                <h3>${esc(item.title)}</h3>
+                <p>${esc(item.summary)}</p>
+                ${related ? `<div class='related-sources'>同题报道：${related}</div>` : ''}
+                <div class='card-footer'>
+                    <button class='action-btn btn-read'>${read ? '已读' : 'Mark Read'}</button>
+                    <a href='${esc(item.link)}' target='_blank' class='btn-primary'>Read Full →</a>
+                </div>`;
+            card.querySelector('.btn-read').addEventListener('click', (e) => toggleRead(item.id, e.target));
+            return card;
+        }
+        function isNearViewport(el) {
+            const rect = el.getBoundingClientRect();
+            return rect.top < window.innerHeight + 400;
+        }
+        async function loadShard(loader) {
+            // 离线或分片已被新一次部署删除时按空分片处理
+            try {
+                const resp = await fetch(loader.shards[loader.next++].file);
+                return resp.ok ? (await resp.json()).filter(i => i.ts >= loader.cutoff) : [];
+            } catch (e) {
+                return [];
+            }
+        }
 
-    groups = {cat: [] for cat in CATEGORY_ORDER}
-    for item in all_data:
-        groups[item["category"]].append(item)
+        async function renderMore(cat) {
+            const loader = loaders[cat];
+            if (!loader || loader.busy) return;
+            loader.busy = true;
+            let rendered = 0;
+            try {
+                while (rendered < PAGE_SIZE) {
+                    if (!loader.buffer.length) {
+                        if (loader.next >= loader.shards.length) break;
+                        const items = await loadShard(loader);
+                        if (loaders[cat] !== loader) return;
+                        loader.buffer = items;
+                        continue;
+                    }
+                    loader.grid.insertBefore(buildCard(loader.buffer.shift()), loader.sentinel);
+                    rendered++;
+                }
+            } finally {
+                loader.busy = false;
+            }
+            const done = loader.next >= loader.shards.length && !loader.buffer.length;
+            loader.sentinel.style.display = done ? 'none' : '';
+            if (!done && isNearViewport(loader.sentinel)) renderMore(cat);
+        }
+        function applyDaysFilter(days) {
+            const cutoff = Math.floor(Date.now() / 1000) - days * 86400;
+            // 分片按日期切分，多取一天以兼容时区差异
+            const minDay = new Date((cutoff - 86400) * 1000).toISOString().slice(0, 10);
+            Object.entries(MANIFEST.categories).forEach(([cat, meta]) => {
+                const section = document.getElementById(cat);
+                const sentinel = section && section.querySelector('.grid-sentinel');
+                if (!sentinel) return;
+                const grid = section.querySelector('.grid');
+                grid.querySelectorAll('.card-item').forEach(card => card.remove());
+                loaders[cat] = {
+                    shards: meta.shards.filter(s => s.day >= minDay),
+                    next: 0,
+                    buffer: [],
+                    cutoff: cutoff,
+                    grid: grid,
+                    sentinel: sentinel,
+                    busy: false,
+                };
+                sentinel.style.display = '';
+                renderMore(cat);
+            });
+        }
+        window.onload = () => {
+            observer = new IntersectionObserver((entries) => {
+                entries.forEach(entry => { if (entry.isIntersecting) renderMore(entry.target.dataset.cat); });
+            }, { root: document.querySelector('.main'), rootMargin: '400px' });
+            document.querySelectorAll('.grid-sentinel').forEach(el => observer.observe(el));
+            document.querySelectorAll('.filter-btn').forEach(btn => {
+                btn.addEventListener('click', (e) => {
+                    document.querySelectorAll('.filter-btn').forEach(b => b.classList.remove('active'));
+                    e.target.classList.add('active');
+                    applyDaysFilter(parseInt(e.target.dataset.days));
+                });
+            });
+            applyDaysFilter(7);
+        };
+    </script>
+    """
 
-    sections = []
-    for cat in CATEGORY_ORDER:
-        cards = "".join(build_card_html(item) for item in groups[cat][:40])
-        sections.append(
-            f"""
-            <section class='category-section' id='{cat}'>
-                <div class='section-title'>
-                    <span>{CATEGORY_ICON.get(cat, "⚡")} {cat}</span>
-                    <span style='font-size:0.78rem; color:#94a3b8;'>{len(groups[cat])} 条</span>
-                </div>
-                <div class='grid'>{cards or "<div style='color:#94a3b8;'>暂无更新</div>"}</div>
-            </section>
-            """
-        )
-    sections_html = "".join(sections)
+# 两种渲染模式共用：静态页面内容未变时整页跳过重写，易变的运行状态由 status.json 填入，不会显示过期数据；
+# 取不到 status.json（如本地直接打开文件）时保持占位符
+STATUS_JS = """
+    <script>
+        fetch('status.json', { cache: 'no-store' })
+            .then(resp => resp.ok ? resp.json() : null)
+            .then(status => {
+                if (!status) return;
+                document.querySelectorAll('td.next-poll').forEach(td => {
+                    td.textContent = status.next_poll[td.dataset.url] || '-';
+                });
+                document.getElementById('trend-panel').innerHTML = status.trend_html || '';
+            })
+            .catch(() => {});
+    </script>
+    """
 
-    full_html = f"""
+PAGE_TEMPLATE = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -430,7 +871,7 @@ def render_dashboard(all_data, source_health):
             </div>
             <section class='insights-box'>
                 <div class='box-header'>⚡ 本周重点摘要</div>
-                {insights_html or "<div class='insight-row'>暂无足够数据生成摘要...</div>"}
+                {insights_html}
             </section>
             <section class='health-box'>
                 <div class='box-header'>🩺 信源健康状态</div>
@@ -441,6 +882,7 @@ def render_dashboard(all_data, source_health):
                             <th>信源</th>
                             <th>状态</th>
                             <th>近7天条目</th>
+                            <th>下次抓取</th>
                             <th>错误信息</th>
                         </tr>
                     </thead>
@@ -449,6 +891,7 @@ def render_dashboard(all_data, source_health):
                     </tbody>
                 </table>
             </section>
+            <div id='trend-panel'></div>
             {sections_html}
         </main>
         {js}
@@ -456,54 +899,465 @@ def render_dashboard(all_data, source_health):
     </html>
     """
 
-    with open("index.html", "w", encoding="utf-8") as f:
-        f.write(full_html)
+SECTION_TEMPLATE = """
+            <section class='category-section' id='{cat}'>
+                <div class='section-title'>
+                    <span>{icon} {cat}</span>
+                    <span style='font-size:0.78rem; color:#94a3b8;'>{count} 条</span>
+                </div>
+                <div class='grid'>{cards}</div>
+            </section>
+            """
+
+EMPTY_INSIGHTS_HTML = "<div class='insight-row'>暂无足够数据生成摘要...</div>"
+EMPTY_SECTION_HTML = "<div style='color:#94a3b8;'>暂无更新</div>"
+SENTINEL_HTML = "<div class='grid-sentinel' data-cat='{cat}' style='grid-column: 1 / -1; height: 1px;'></div>"
+# 修改卡片、健康表行等在代码中拼接的 HTML 时递增，使增量渲染缓存整体失效；
+# 上面的页面级模板字符串由 TEMPLATE_DIGEST 自动纳入哈希，无需手动递增
+RENDER_CACHE_VERSION = 1
+
+
+def compile_template(text):
+    # 切分为 (字面量, 字段名) 序列，渲染时不再解析模板
+    return [(literal, field) for literal, field, _, _ in string.Formatter().parse(text)]
+
+
+PAGE_CHUNKS = compile_template(PAGE_TEMPLATE)
+SECTION_CHUNKS = compile_template(SECTION_TEMPLATE)
+TEMPLATE_DIGEST = render_cache.digest(
+    [
+        DASHBOARD_STYLE, DASHBOARD_JS, SHARD_JS, STATUS_JS, PAGE_TEMPLATE, SECTION_TEMPLATE,
+        EMPTY_INSIGHTS_HTML, EMPTY_SECTION_HTML, SENTINEL_HTML,
+    ]
+)
+
+
+def write_section(write, cat, items, total):
+    values = {"cat": cat, "icon": CATEGORY_ICON.get(cat, "⚡"), "count": str(total)}
+    for literal, field in SECTION_CHUNKS:
+        write(literal)
+        if field == "cards":
+            if not items:
+                write(EMPTY_SECTION_HTML)
+            for item in items:
+                write(build_card_html(item))
+        elif field:
+            write(values[field])
+
+
+def card_key(item):
+    related = "|".join(f"{r['source']}\x1e{r['link']}" for r in item.get("related") or ())
+    return (
+        f"{item['id']}\x1e{item['ts']}\x1e{item['date_str']}\x1e{item['source']}\x1e{item['title']}\x1e"
+        f"{item['link']}\x1e{item['summary']}\x1e{int(bool(item['is_video']))}\x1e{related}"
+    )
+
+
+def section_key(cat, items, total):
+    # 区块 HTML 只取决于分类、总数与所渲染卡片的全部字段
+    return render_cache.digest(
+        [RENDER_CACHE_VERSION, TEMPLATE_DIGEST, "section", cat, total] + [card_key(i) for i in items]
+    )
+
+
+def write_sections(write, groups, max_cards, cache=None):
+    for cat in CATEGORY_ORDER:
+        items = groups[cat] if max_cards is None else groups[cat][:max_cards]
+        if cache is None:
+            # 无缓存时逐张卡片流式写出，不在内存中拼出整个区块
+            write_section(write, cat, items, len(groups[cat]))
+            continue
+        key = section_key(cat, items, len(groups[cat]))
+        write(render_cache.fragment(cache, key, lambda: render_section(cat, items, len(groups[cat]))))
+
+
+def render_section(cat, items, total):
+    chunks = []
+    write_section(chunks.append, cat, items, total)
+    return "".join(chunks)
+
+
+def page_values(all_data, source_health, js, cache=None, insights_html=None):
+    return {
+        "style": DASHBOARD_STYLE,
+        "js": js + STATUS_JS,
+        "nav_links": "".join(
+            [f"<a href='#{cat}' class='nav-item'>{CATEGORY_ICON.get(cat, '⚡')} {cat}</a>" for cat in CATEGORY_ORDER]
+        ),
+        "insights_html": insights_html or build_weekly_insights(all_data) or EMPTY_INSIGHTS_HTML,
+        "health_html": build_health_table(source_health, cache),
+    }
+
+
+def write_page(write, values, sections_writer):
+    for literal, field in PAGE_CHUNKS:
+        write(literal)
+        if field == "sections_html":
+            sections_writer(write)
+        elif field:
+            write(values[field])
+
+
+def write_dashboard(write, all_data, source_health, max_cards=CARDS_PER_CATEGORY):
+    groups = {cat: [] for cat in CATEGORY_ORDER}
+    for item in all_data:
+        groups[item["category"]].append(item)
+
+    values = page_values(all_data, source_health, DASHBOARD_JS)
+    write_page(write, values, lambda w: write_sections(w, groups, max_cards))
+
+
+def content_key(parts, source_health):
+    # 页面内容指纹：覆盖页面中的全部内容（下次抓取时间与运行趋势不在页面里，见 write_status）
+    fields = ("category", "source", "url", "ok", "skipped", "cache_hit", "failures", "count", "error")
+    health = [render_cache.digest([s.get(f) for f in fields]) for s in source_health]
+    return render_cache.digest([RENDER_CACHE_VERSION, TEMPLATE_DIGEST] + list(parts) + health)
+
+
+def render_dashboard(
+    all_data, source_health, output_path="index.html", max_cards=CARDS_PER_CATEGORY, cache=None
+):
+    # 返回是否写出了文件；带 cache 时未变化的区块与健康表行原样复用，内容未变则整页跳过
+    groups = {cat: [] for cat in CATEGORY_ORDER}
+    for item in all_data:
+        groups[item["category"]].append(item)
+
+    insights_html = build_weekly_insights(all_data) or EMPTY_INSIGHTS_HTML
+    if cache is not None and max_cards is not None:
+        keys = [section_key(cat, groups[cat][:max_cards], len(groups[cat])) for cat in CATEGORY_ORDER]
+        key = content_key(["inline", insights_html] + keys, source_health)
+        if render_cache.unchanged(cache, output_path, key):
+            render_cache.touch(cache, keys + [health_row_key(s) for s in source_health])
+            cache["skipped"] += 1
+            return False
+    else:
+        # 不限卡片数时区块可能极大，仍按卡片流式写出，不进缓存
+        cache, key = None, None
+
+    values = page_values(all_data, source_health, DASHBOARD_JS, cache, insights_html)
+    # 卡片逐张写入带缓冲的文件，不在内存中拼出整页
+    with atomic_output(output_path, buffering=RENDER_BUFFER_SIZE) as f:
+        write_page(f.write, values, lambda w: write_sections(w, groups, max_cards, cache))
+    render_cache.mark_written(cache, output_path, key)
+    return True
+
+
+def write_status(output_path, source_health, run_history=None):
+    # 每次运行都写：下次抓取时间（按信源 URL）与运行趋势面板，页面加载时填入
+    status = {
+        "next_poll": {
+            s["url"]: datetime.fromtimestamp(s["next_poll"]).strftime("%m-%d %H:%M")
+            for s in source_health
+            if s.get("url") and s.get("next_poll")
+        },
+        "trend_html": build_trend_table(run_history),
+    }
+    path = os.path.join(os.path.dirname(output_path) or ".", STATUS_FILE_NAME)
+    with atomic_output(path) as f:
+        json.dump(status, f, ensure_ascii=False, separators=(",", ":"))
+    return path
+
+
+def shard_record(item):
+    record = {
+        "id": item["id"],
+        "ts": item["ts"],
+        "date_str": item["date_str"],
+        "source": item["source"],
+        "title": item["title"],
+        "summary": item["summary"],
+        "link": item["link"],
+        "is_video": bool(item["is_video"]),
+    }
+    if item.get("related"):
+        record["related"] = item["related"]
+    return record
+
+
+def write_text(path, text, cache=None):
+    # 内容与上次写出的一致且文件仍在时跳过，文件 mtime 与提交 diff 都不变
+    key = render_cache.digest([text]) if cache is not None else None
+    if render_cache.unchanged(cache, path, key):
+        cache["skipped"] += 1
+        return False
+    with atomic_output(path) as f:
+        f.write(text)
+    render_cache.mark_written(cache, path, key)
+    return True
+
+
+def write_data_shards(all_data, data_dir, cache=None):
+    # 每个分类每天一个 JSON 分片，文件名随分类名哈希，避免中文/空格路径
+    groups = {cat: {} for cat in CATEGORY_ORDER}
+    for item in all_data:
+        groups[item["category"]].setdefault(item["date_str"], []).append(item)
+
+    manifest = {"categories": {}}
+    written = set()
+    for cat in CATEGORY_ORDER:
+        slug = hashlib.md5(cat.encode("utf-8")).hexdigest()[:8]
+        shards = []
+        for day in sorted(groups[cat], reverse=True):
+            items = sorted(groups[cat][day], key=lambda x: x["ts"], reverse=True)
+            rel = f"{slug}/{day}.json"
+            path = os.path.join(data_dir, slug, f"{day}.json")
+            write_text(path, json.dumps([shard_record(i) for i in items], ensure_ascii=False, separators=(",", ":")), cache)
+            written.add(os.path.normpath(path))
+            shards.append({"day": day, "file": f"{os.path.basename(data_dir)}/{rel}", "count": len(items)})
+        manifest["categories"][cat] = {"count": sum(s["count"] for s in shards), "shards": shards}
+
+    # 清理已滚出窗口的旧分片
+    for root, _, files in os.walk(data_dir):
+        for name in files:
+            path = os.path.normpath(os.path.join(root, name))
+            if name.endswith(".json") and name != "manifest.json" and path not in written:
+                os.remove(path)
+    write_text(os.path.join(data_dir, "manifest.json"), json.dumps(manifest, ensure_ascii=False, separators=(",", ":")), cache)
+    return manifest
+
+
+def render_dashboard_shell(
+    all_data, source_health, output_path="index.html", data_dir=None, cache=None
+):
+    data_dir = data_dir or os.path.join(os.path.dirname(output_path) or ".", SHARD_DIR_NAME)
+    manifest = write_data_shards(all_data, data_dir, cache)
+
+    def write_shell_sections(write):
+        for cat in CATEGORY_ORDER:
+            count = manifest["categories"][cat]["count"]
+            values = {"cat": cat, "icon": CATEGORY_ICON.get(cat, "⚡"), "count": str(count)}
+            for literal, field in SECTION_CHUNKS:
+                write(literal)
+                if field == "cards":
+                    write(SENTINEL_HTML.format(cat=html.escape(cat)) if count else EMPTY_SECTION_HTML)
+                elif field:
+                    write(values[field])
+
+    manifest_js = json.dumps(manifest, ensure_ascii=False, separators=(",", ":")).replace("</", "<\\/")
+    insights_html = build_weekly_insights(all_data) or EMPTY_INSIGHTS_HTML
+    key = None
+    if cache is not None:
+        key = content_key(["shell", insights_html, manifest_js], source_health)
+        if render_cache.unchanged(cache, output_path, key):
+            render_cache.touch(cache, [health_row_key(s) for s in source_health])
+            cache["skipped"] += 1
+            return False
+    values = page_values(
+        all_data, source_health, SHARD_JS.replace("__MANIFEST__", manifest_js), cache, insights_html
+    )
+    with atomic_output(output_path, buffering=RENDER_BUFFER_SIZE) as f:
+        write_page(f.write, values, write_shell_sections)
+    render_cache.mark_written(cache, output_path, key)
+    return True
+
+
+def dedup_by_link(items):
+    # 去重（同链接只保留最新，同时刻取先出现的），原地压缩后按时间倒序排列
+    best = {}
+    for idx, item in enumerate(items):
+        kept = best.get(item["link"])
+        if kept is None or item["ts"] > items[kept]["ts"]:
+            best[item["link"]] = idx
+    write = 0
+    for idx, item in enumerate(items):
+        if best[item["link"]] == idx:
+            items[write] = item
+            write += 1
+    del items[write:]
+    items.sort(key=lambda x: x["ts"], reverse=True)
+    return items
+
+
+def near_dup_text(item):
+    return f"{item['title']} {normalize_text(item.get('raw_summary', ''), limit=BODY_KEEP_CHARS)}"
+
+
+def release_raw_bodies(items):
+    # 摘要完成后原始 HTML 不再需要，只把与聚类共用的截断纯文本另存到 body_text（排序打分读取）；
+    # 不回写 raw_summary：清洗结果再被当作 HTML 清洗一次会丢内容（&lt;core update&gt; 会被当成标签删掉）
+    for item in items:
+        item["body_text"] = normalize_text(item["raw_summary"], limit=BODY_KEEP_CHARS)
+        item["raw_summary"] = ""
 
 
-def fetch_data():
+def scheduling_enabled():
+    # 录制 / 回放时总是抓取全部信源：跳过的信源既录不进 fixtures，回放时也会读到线上缓存
+    return SCHEDULER_ENABLED and not replay.REPLAY_MODE
+
+
+def fetch_sources_scheduled(time_limit, now_ts, schedule=None):
+    # 只抓取到期的信源，抓取结果回写调度状态；schedule 由常驻模式传入以跨轮复用
+    if not scheduling_enabled():
+        return fetch_all_sources(time_limit)
+    state = scheduler.load_state() if schedule is None else schedule
+    due = scheduler.due_urls(RSS_SOURCES, state, now_ts)
+    skip = {url for feeds in RSS_SOURCES.values() for url in feeds.values() if url not in due}
+    all_data, source_health = fetch_all_sources(time_limit, skip=skip)
+    scheduler.update(state, source_health, now_ts)
+    try:
+        scheduler.save_state(state)
+    except OSError as e:
+        print(f"[WARN] schedule state write failed: {e}")
+    return all_data, source_health
+
+
+def use_cache_dir(cache_dir):
+    # 把各模块的持久化状态（HTTP 缓存、摘要、条目库、调度、渲染片段、运行历史）整体指向另一个目录
+    http_cache.HTTP_CACHE_DIR = os.path.join(cache_dir, "http")
+    summary_cache.SUMMARY_CACHE_PATH = os.path.join(cache_dir, "summaries.jsonl")
+    item_store.ITEM_STORE_PATH = os.path.join(cache_dir, "items.db")
+    run_report.RUN_HISTORY_PATH = os.path.join(cache_dir, "run_history.jsonl")
+    scheduler.SCHEDULE_PATH = os.path.join(cache_dir, "schedule.json")
+    render_cache.RENDER_CACHE_PATH = os.path.join(cache_dir, "render_cache.json")
+
+
+def open_context():
+    # 跨运行复用的状态：模型客户端、摘要缓存、调度状态、条目库连接与渲染片段（常驻模式下常驻内存）
+    cache_dir = None
+    if replay.REPLAY_MODE:
+        # 录制 / 回放使用一次性的临时目录：不把 fixtures 条目写进生产条目库，
+        # 也不让已有的摘要缓存命中绕过录制的模型响应
+        cache_dir = tempfile.mkdtemp(prefix="seo-monitor-replay-")
+        use_cache_dir(cache_dir)
+    return {
+        "ai_client": build_ai_client(),
+        "summary_store": summary_cache.load_store(),
+        "schedule": scheduler.load_state(),
+        "item_store": item_store.open_store() if ITEM_STORE_ENABLED else None,
+        "render_cache": render_cache.load_cache(),
+        "cache_dir": cache_dir,
+    }
+
+
+def close_context(ctx):
+    summary_cache.save_store(ctx["summary_store"])
+    if ctx["item_store"] is not None:
+        ctx["item_store"].close()
+        ctx["item_store"] = None
+    if ctx["cache_dir"] is not None:
+        shutil.rmtree(ctx["cache_dir"], ignore_errors=True)
+        ctx["cache_dir"] = None
+
+
+def fetch_data(output_path="index.html", ctx=None):
+    owns_ctx = ctx is None
+    ctx = open_context() if owns_ctx else ctx
+    try:
+        return run_pipeline(ctx, output_path)
+    finally:
+        if owns_ctx:
+            close_context(ctx)
+
+
+def run_pipeline(ctx, output_path):
+    report = run_report.new_report()
     now = datetime.now()
     time_limit = now - timedelta(days=7)
-    all_data = []
-    source_health = []
+    with run_report.stage(report, "fetch"):
+        all_data, source_health = fetch_sources_scheduled(time_limit, now.timestamp(), ctx["schedule"])
+    return process_items(ctx, report, all_data, source_health, now, output_path)
+
+
+def process_items(ctx, report, all_data, source_health, now, output_path):
+    # 抓取之后的全部阶段；分片运行时由合并步骤在汇总后的条目上调用一次
+    time_limit = now - timedelta(days=7)
+    run_report.record_sources(report, source_health)
+    cache_hits = report["counters"]["http_cache_hits"]
+    skipped = report["counters"]["sources_skipped"]
+    print(
+        f"[INFO] fetched {len(source_health) - skipped} sources ({skipped} not due), "
+        f"{cache_hits} served from HTTP cache"
+    )
 
-    for category, sources in RSS_SOURCES.items():
-        for source, url in sources.items():
-            items, status = parse_feed_items(category, source, url, time_limit)
-            all_data.extend(items)
-            source_health.append(status)
+    with run_report.stage(report, "dedup"):
+        all_data = dedup_by_link(all_data)
+
+    store = ctx["item_store"]
+    if store is not None:
+        # 新条目写入条目库，看板按 DASHBOARD_DAYS 窗口从库中读取（含历史摘要）
+        with run_report.stage(report, "item_store"):
+            item_store.upsert_items(store, all_data)
+            pruned = item_store.prune(store)
+            all_data = dedup_by_link(
+                item_store.load_window(store, (now - timedelta(days=DASHBOARD_DAYS)).timestamp())
+            )
+        print(f"[INFO] item store: {len(all_data)} items in {DASHBOARD_DAYS}-day window, {pruned} pruned")
 
-    # 去重（同链接只保留最新）
-    unique_by_link = {}
-    for item in sorted(all_data, key=lambda x: x["ts"], reverse=True):
-        if item["link"] not in unique_by_link:
-            unique_by_link[item["link"]] = item
-    all_data = list(unique_by_link.values())
+    if NEAR_DUP_ENABLED:
+        # 摘要前合并多家媒体对同一事件的报道，每簇只生成一次摘要
+        with run_report.stage(report, "near_dup"):
+            before = len(all_data)
+            all_data = near_dup.cluster_items(all_data, near_dup_text)
+        print(f"[INFO] near-dup clustering: {before} -> {len(all_data)} items")
 
     inject_x_fallback_cards(all_data, time_limit)
 
-    ai_client = build_ai_client()
-    final_items = []
-    for item in all_data:
-        if item.get("summary"):
-            final_items.append(item)
-            continue
+    with run_report.stage(report, "summarize"):
+        ai_client = ctx["ai_client"]
+        summary_store = ctx["summary_store"]
+        summary_cache.start_run(summary_store)
+        pending = []
+        summarized = []
+        for item in all_data:
+            if item.get("summary"):
+                continue
+            if ai_client is None:
+                item["summary"] = fallback_cn_summary(item)
+                continue
+            item["summary"] = summary_cache.lookup(summary_store, item, PROMPT_VERSION)
+            if item["summary"] is None:
+                pending.append(item)
+            else:
+                summarized.append(item)
 
-        if ai_client is None:
-            item["summary"] = fallback_cn_summary(item)
-            final_items.append(item)
-            continue
+        if pending:
+            # 并发请求模型；失败或超出预算的条目回退为规则摘要，不再丢弃
+            results, stats = summarizer.run_summaries(
+                pending,
+                call=lambda item: request_ai_summary(ai_client, item),
+                fallback=fallback_cn_summary,
+                estimate_tokens=estimate_summary_tokens,
+                call_batch=lambda items: request_ai_summary_batch(ai_client, items),
+                estimate_batch_tokens=estimate_batch_summary_tokens,
+            )
+            for item, (summary, from_ai) in zip(pending, results):
+                item["summary"] = summary
+                if from_ai:
+                    summary_cache.remember(summary_store, item, PROMPT_VERSION, summary)
+                    summarized.append(item)
+            run_report.record_llm(report, stats, summarizer.percentile)
+            print(f"[INFO] summarizer: {summarizer.format_stats(stats)}")
+        summary_cache.save_store(summary_store)
+        run_report.count(report, "summary_cache_hits", summary_store["hits"])
+        if ai_client is not None:
+            print(f"[INFO] summary cache: {summary_store['hits']} hits, {len(pending)} misses")
 
-        summary = generate_ai_summary(ai_client, item)
-        if summary is None:
-            # 按需跳过AI失败条目，避免整批任务中断
-            continue
-        item["summary"] = summary
-        final_items.append(item)
+        if store is not None:
+            # 只回写模型摘要；规则摘要下次运行仍会尝试调用模型
+            item_store.save_summaries(store, summarized)
+        release_raw_bodies(all_data)
 
-    final_items.sort(key=lambda x: x["ts"], reverse=True)
-    render_dashboard(final_items, source_health)
-    print(f"[OK] Generated index.html with {len(final_items)} items")
+    with run_report.stage(report, "render"):
+        final_items = sorted(all_data, key=lambda x: x["ts"], reverse=True)
+        run_history = run_report.load_history()
+        cache = ctx["render_cache"]
+        render_cache.start_run(cache)
+        if RENDER_MODE == "shards":
+            render_dashboard_shell(final_items, source_health, output_path=output_path, cache=cache)
+        else:
+            render_dashboard(final_items, source_health, output_path=output_path, cache=cache)
+        write_status(output_path, source_health, run_history)
+        render_cache.save_cache(cache)
+    run_report.count(report, "items_rendered", len(final_items))
+    run_report.count(report, "render_fragments_reused", cache["hits"])
+    run_report.count(report, "render_fragments_rendered", cache["misses"])
+    run_report.count(report, "render_writes_skipped", cache["skipped"])
+    run_report.count(report, "render_bytes_written", cache["bytes_written"])
+    run_report.finish(report)
+    print(f"[INFO] stages: {run_report.format_stages(report)}")
+    print(f"[OK] Generated {output_path} with {len(final_items)} items")
+    return report
 
 
 if __name__ == "__main__":
-    fetch_data()
+    run_report.run_profiled(fetch_data)
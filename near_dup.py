@@ -0,0 +1,115 @@
+import os
+import re
+import hashlib
+
+# ==========================================
+# 近似重复聚类：同一事件被多家媒体报道时只保留一张卡片
+# One-permutation MinHash + LSH 分桶，整体近似线性
+# ==========================================
+NEAR_DUP_THRESHOLD = float(os.environ.get("NEAR_DUP_THRESHOLD", "0.5"))
+# 同一事件的报道时间差上限（秒），避免把周期性栏目误判为重复
+NEAR_DUP_MAX_GAP = int(os.environ.get("NEAR_DUP_MAX_GAP_HOURS", "72")) * 3600
+
+NUM_BINS = 36
+BANDS = 12
+ROWS = NUM_BINS // BANDS
+MAX_HASH = (1 << 64) - 1
+BIN_OFFSET = MAX_HASH // NUM_BINS + 1
+
+WORD_RE = re.compile(r"[a-z0-9]+(?:['’][a-z]+)?")
+CJK_RE = re.compile(r"[一-鿿]+")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "how", "in", "is", "it",
+    "its", "new", "of", "on", "or", "that", "the", "this", "to", "was", "what", "why", "will", "with", "you",
+    "your",
+}
+
+
+def tokenize(text):
+    text = text.lower()
+    tokens = {w for w in WORD_RE.findall(text) if w not in STOPWORDS and len(w) > 1}
+    for run in CJK_RE.findall(text):
+        tokens.update(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def signature(tokens, hash_cache):
+    bins = [MAX_HASH] * NUM_BINS
+    for tok in tokens:
+        h = hash_cache.get(tok)
+        if h is None:
+            h = int.from_bytes(hashlib.blake2b(tok.encode("utf-8"), digest_size=8).digest(), "big")
+            hash_cache[tok] = h
+        b = h % NUM_BINS
+        v = h // NUM_BINS
+        if v < bins[b]:
+            bins[b] = v
+    # 空桶按循环右移借用相邻非空桶（densification），保证签名可比
+    if MAX_HASH in bins:
+        filled = list(bins)
+        for i in range(NUM_BINS):
+            if filled[i] != MAX_HASH:
+                continue
+            j = i + 1
+            while filled[j % NUM_BINS] == MAX_HASH:
+                j += 1
+            bins[i] = filled[j % NUM_BINS] + (j - i) * BIN_OFFSET
+    return bins
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def cluster_items(items, text_fn, threshold=None, max_gap=None):
+    # 每簇保留最新一条，其余来源挂在 related 字段
+    threshold = NEAR_DUP_THRESHOLD if threshold is None else threshold
+    max_gap = NEAR_DUP_MAX_GAP if max_gap is None else max_gap
+    n = len(items)
+    token_sets = [tokenize(text_fn(item)) for item in items]
+    hash_cache = {}
+    parent = list(range(n))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    buckets = {}
+    for idx, tokens in enumerate(token_sets):
+        if len(tokens) < 3:
+            continue
+        sig = signature(tokens, hash_cache)
+        for band in range(BANDS):
+            key = (band, tuple(sig[band * ROWS:(band + 1) * ROWS]))
+            head = buckets.setdefault(key, idx)
+            if head == idx:
+                continue
+            # 每个桶只和桶首比对，避免热门桶退化为平方复杂度
+            ri, rh = find(idx), find(head)
+            if ri == rh:
+                continue
+            if abs(items[idx]["ts"] - items[head]["ts"]) > max_gap:
+                continue
+            if jaccard(tokens, token_sets[head]) >= threshold:
+                parent[ri] = rh
+
+    clusters = {}
+    for idx in range(n):
+        clusters.setdefault(find(idx), []).append(idx)
+
+    leads = set()
+    for members in clusters.values():
+        members.sort(key=lambda i: (-items[i]["ts"], i))
+        leads.add(members[0])
+        if len(members) > 1:
+            items[members[0]]["related"] = [
+                {"source": items[i]["source"], "link": items[i]["link"]} for i in members[1:]
+            ]
+        else:
+            items[members[0]].pop("related", None)
+    # 保持输入顺序，只去掉被合并的条目
+    return [item for idx, item in enumerate(items) if idx in leads]
@@ -0,0 +1,164 @@
+import os
+import re
+import json
+import math
+import heapq
+import time
+
+from textnorm import normalize_text
+
+# ==========================================
+# 本周重点排序：关键词倒排索引 + 信源权重 + 时间衰减，按分类堆取 Top-K
+# 权重可通过 RANKING_CONFIG 指向的 JSON 文件覆盖（键与 DEFAULT_CONFIG 相同）
+# ==========================================
+RANKING_CONFIG = os.environ.get("RANKING_CONFIG", "")
+
+DEFAULT_CONFIG = {
+    # 关键词组：命中同一组只计一次分
+    "groups": {
+        "core_update": {
+            "weight": 3.0,
+            "terms": [
+                "core update", "algorithm update", "spam update", "helpful content", "ranking update",
+                "核心更新", "算法更新",
+            ],
+        },
+        "ai_overviews": {
+            "weight": 3.0,
+            "terms": [
+                "ai overviews", "ai overview", "ai mode", "sge", "search generative experience", "ai 概览", "ai概览",
+            ],
+        },
+        "geo": {
+            "weight": 2.5,
+            "terms": [
+                "geo", "generative engine optimization", "llm visibility", "ai search", "chatgpt search",
+                "perplexity", "answer engine", "生成式引擎优化", "ai 搜索", "ai搜索",
+            ],
+        },
+        "furniture_dtc": {
+            "weight": 2.0,
+            "terms": [
+                "furniture", "home decor", "dtc", "direct-to-consumer", "shopify", "ecommerce", "e-commerce",
+                "家具", "独立站", "跨境电商",
+            ],
+        },
+    },
+    # 信源权重（未列出的信源为 1.0）
+    "sources": {
+        "Google Search Central": 1.5,
+        "Search Engine Land": 1.2,
+        "SEO Roundtable": 1.2,
+        "Search Engine Journal (AI Search)": 1.2,
+        "Microsoft Bing Blog": 1.1,
+    },
+    # 未命中任何关键词时的基础分
+    "base": 1.0,
+    # 关键词出现在标题中时额外乘数
+    "title_boost": 1.5,
+    # 时间衰减半衰期（小时）
+    "half_life_hours": 72,
+    # 每个分类取前 K 条
+    "top_k": 3,
+    # 只在最近若干天的条目中排序
+    "window_days": 7,
+}
+
+WORD_RE = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+CJK_RE = re.compile(r"[一-鿿]")
+
+
+def load_config(path=None):
+    config = json.loads(json.dumps(DEFAULT_CONFIG))
+    path = RANKING_CONFIG if path is None else path
+    if not path:
+        return config
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            override = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[WARN] ranking config ignored: {path} -> {e}")
+        return config
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(config.get(key), dict):
+            config[key].update(value)
+        else:
+            config[key] = value
+    return config
+
+
+def build_index(groups):
+    # 英文词条以第一个词为键建倒排索引，命中键后再用带词边界的正则校验整句
+    # （避免 "ai mode" 命中 "ai models"）；中文开头的词条没有分词边界，合并成一个正则一次扫描
+    index = {}
+    cjk_terms = {}
+    for name, group in groups.items():
+        for term in group["terms"]:
+            term = term.lower()
+            words = WORD_RE.findall(term)
+            if CJK_RE.match(term) or not words:
+                cjk_terms.setdefault(term, []).append(name)
+                continue
+            phrase = None
+            if len(words) > 1 or CJK_RE.search(term):
+                phrase = re.compile(rf"(?<![a-z0-9]){re.escape(term)}(?![a-z0-9])")
+            index.setdefault(words[0], []).append((name, term, phrase))
+    pattern = "|".join(re.escape(t) for t in sorted(cjk_terms, key=len, reverse=True))
+    return index, cjk_terms, re.compile(pattern) if pattern else None
+
+
+def matched_groups(text, index):
+    words, cjk_terms, cjk_re = index
+    hits = set()
+    for word in set(WORD_RE.findall(text)):
+        for name, term, phrase in words.get(word, ()):
+            if name in hits:
+                continue
+            # 先做子串判断，多数候选在这一步就被排除，正则只用于确认词边界
+            if phrase is None or (term in text and phrase.search(text)):
+                hits.add(name)
+    if cjk_re is not None:
+        for term in set(cjk_re.findall(text)):
+            hits.update(cjk_terms[term])
+    return hits
+
+
+class Ranker:
+    def __init__(self, config=None):
+        self.config = config or load_config()
+        self.index = build_index(self.config["groups"])
+        self.weights = {name: group["weight"] for name, group in self.config["groups"].items()}
+        self.decay = math.log(2) / (self.config["half_life_hours"] * 3600)
+
+    def score(self, item, now):
+        title = (item.get("title") or "").lower()
+        text = item.get("body_text")
+        if text is None:
+            text = normalize_text(item.get("raw_summary", ""), limit=600)
+        body = f"{item.get('summary') or ''} {text}".lower()
+        title_hits = matched_groups(title, self.index)
+        hits = title_hits | matched_groups(body, self.index)
+        relevance = self.config["base"]
+        for name in hits:
+            boost = self.config["title_boost"] if name in title_hits else 1.0
+            relevance += self.weights[name] * boost
+        source_weight = self.config["sources"].get(item.get("source"), 1.0)
+        age = max(0, now - item.get("ts", now))
+        return relevance * source_weight * math.exp(-self.decay * age)
+
+    def top_k(self, items, categories, now=None, k=None):
+        # 每个分类维护大小为 K 的小顶堆，整体 O(n log K)；同分时较新的条目优先
+        now = time.time() if now is None else now
+        k = self.config["top_k"] if k is None else k
+        since = now - self.config["window_days"] * 86400
+        heaps = {cat: [] for cat in categories}
+        for idx, item in enumerate(items):
+            heap = heaps.get(item["category"])
+            if heap is None or item["ts"] < since:
+                continue
+            entry = (self.score(item, now), item["ts"], -idx, item)
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry[:3] > heap[0][:3]:
+                heapq.heapreplace(heap, entry)
+        return {cat: [e[3] for e in sorted(heap, key=lambda e: e[:3], reverse=True)] for cat, heap in heaps.items()}
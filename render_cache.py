@@ -0,0 +1,116 @@
+import os
+import json
+import hashlib
+
+from atomic_io import atomic_output
+from http_cache import CACHE_DIR
+
+# ==========================================
+# 增量渲染缓存：分类区块与健康表行按输入内容哈希复用已渲染的 HTML
+# 页面内容哈希未变且磁盘上的文件仍是上次写出的字节时整页跳过写出
+# （运行趋势、下次抓取时间等每次都变的运行状态不在页面里，另写 status.json）
+# ==========================================
+RENDER_CACHE_PATH = os.path.join(CACHE_DIR, "render_cache.json")
+# RENDER_FORCE=1 时总是完整写出页面
+RENDER_FORCE = os.environ.get("RENDER_FORCE", "0") == "1"
+
+
+def digest(parts):
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(str(part).encode("utf-8", "surrogatepass"))
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+
+def load_cache(path=None):
+    path = path or RENDER_CACHE_PATH
+    cache = {
+        "path": path,
+        "fragments": {},
+        "outputs": {},
+        "used": set(),
+        "hits": 0,
+        "misses": 0,
+        "skipped": 0,
+        "bytes_written": 0,
+    }
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        cache["fragments"] = data.get("fragments", {})
+        cache["outputs"] = data.get("outputs", {})
+    except (OSError, ValueError):
+        pass
+    return cache
+
+
+def start_run(cache):
+    cache["used"] = set()
+    cache["hits"] = cache["misses"] = cache["skipped"] = cache["bytes_written"] = 0
+
+
+def touch(cache, keys):
+    # 整页跳过时也标记本次仍有效的片段，避免保存时被淘汰
+    if cache is not None:
+        cache["used"].update(keys)
+
+
+def fragment(cache, key, build):
+    # 命中则原样返回上次的 HTML，否则调用 build 渲染并记录
+    if cache is None:
+        return build()
+    cache["used"].add(key)
+    text = cache["fragments"].get(key)
+    if text is None:
+        text = build()
+        cache["fragments"][key] = text
+        cache["misses"] += 1
+    else:
+        cache["hits"] += 1
+    return text
+
+
+def file_digest(path):
+    h = hashlib.blake2b(digest_size=16)
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    except OSError:
+        return None
+    return h.hexdigest()
+
+
+def unchanged(cache, path, content_key):
+    # .cache 可能来自别的运行或分支（actions/cache 的 restore-keys），
+    # 除内容哈希外还要核对磁盘文件确为上次写出的字节，否则照常重写
+    if cache is None or RENDER_FORCE:
+        return False
+    recorded = cache["outputs"].get(path)
+    if not isinstance(recorded, list) or recorded[0] != content_key:
+        return False
+    return file_digest(path) == recorded[1]
+
+
+def mark_written(cache, path, content_key):
+    if cache is None:
+        return
+    cache["outputs"][path] = [content_key, file_digest(path)]
+    cache["bytes_written"] += os.path.getsize(path)
+
+
+def save_cache(cache):
+    # 只保留本次用到的片段，已滚出窗口的区块随之淘汰
+    if cache is None:
+        return
+    fragments = {k: v for k, v in cache["fragments"].items() if k in cache["used"]}
+    outputs = {k: v for k, v in cache["outputs"].items() if os.path.exists(k)}
+    cache["fragments"] = fragments
+    cache["outputs"] = outputs
+    path = cache["path"]
+    try:
+        with atomic_output(path) as f:
+            json.dump({"fragments": fragments, "outputs": outputs}, f, ensure_ascii=False, separators=(",", ":"))
+    except OSError as e:
+        print(f"[WARN] render cache write failed: {path} -> {e}")
@@ -0,0 +1,187 @@
+import os
+import json
+import hashlib
+import threading
+from types import SimpleNamespace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, unquote, urlparse
+
+# ==========================================
+# 录制 / 回放：把信源原文与模型响应存入 fixtures，离线重放整条流水线
+# REPLAY_MODE=record 正常抓取并录制；REPLAY_MODE=replay 从本地桩服务与假客户端回放
+# ==========================================
+REPLAY_MODE = os.environ.get("REPLAY_MODE", "").strip().lower()
+FIXTURES_DIR = os.environ.get("FIXTURES_DIR", "fixtures")
+
+_lock = threading.Lock()
+_stub = {"server": None, "base": None}
+
+
+def feeds_dir(fixtures_dir=None):
+    return os.path.join(fixtures_dir or FIXTURES_DIR, "feeds")
+
+
+def llm_path(fixtures_dir=None):
+    return os.path.join(fixtures_dir or FIXTURES_DIR, "llm.jsonl")
+
+
+def url_key(url):
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+def request_key(model, messages):
+    payload = json.dumps({"model": model, "messages": messages}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ------------------------------------------
+# 信源录制与桩服务
+# ------------------------------------------
+def record_feed(url, body, headers, fixtures_dir=None):
+    base = feeds_dir(fixtures_dir)
+    key = url_key(url)
+    with _lock:
+        os.makedirs(base, exist_ok=True)
+        with open(os.path.join(base, f"{key}.body"), "wb") as f:
+            f.write(body)
+        index_path = os.path.join(base, "index.json")
+        index = load_feed_index(fixtures_dir)
+        index[url] = {"key": key, "content_type": headers.get("content-type", "")}
+        with open(index_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, indent=2)
+
+
+def load_feed_index(fixtures_dir=None):
+    try:
+        with open(os.path.join(feeds_dir(fixtures_dir), "index.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class FixtureFeedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = unquote(urlparse(self.path).path[len("/feed/"):])
+        meta = self.server.index.get(url)
+        body = None
+        if meta:
+            try:
+                with open(os.path.join(self.server.feeds_dir, f"{meta['key']}.body"), "rb") as f:
+                    body = f.read()
+            except OSError:
+                body = None
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", meta.get("content_type") or "application/xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_fixture_server(fixtures_dir=None):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureFeedHandler)
+    server.daemon_threads = True
+    server.index = load_feed_index(fixtures_dir)
+    server.feeds_dir = feeds_dir(fixtures_dir)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def resolve_url(url):
+    # 回放模式下把真实地址改写到本地桩服务，健康表仍显示原地址
+    if REPLAY_MODE != "replay":
+        return url
+    with _lock:
+        if _stub["server"] is None:
+            _stub["server"], _stub["base"] = start_fixture_server()
+    return f"{_stub['base']}/feed/{quote(url, safe='')}"
+
+
+# ------------------------------------------
+# 模型响应录制与假客户端
+# ------------------------------------------
+def make_response(content, total_tokens=0):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(total_tokens=total_tokens),
+    )
+
+
+def load_llm_fixtures(fixtures_dir=None):
+    records = {}
+    try:
+        with open(llm_path(fixtures_dir), "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                records[rec["key"]] = rec
+    except OSError:
+        pass
+    return records
+
+
+class _Completions:
+    def __init__(self, create):
+        self.create = create
+
+
+class RecordingClient:
+    def __init__(self, client, fixtures_dir=None):
+        self._client = client
+        self._path = llm_path(fixtures_dir)
+        self.chat = SimpleNamespace(completions=_Completions(self._create))
+
+    def _create(self, model, messages, **kwargs):
+        resp = self._client.chat.completions.create(model=model, messages=messages, **kwargs)
+        usage = getattr(resp, "usage", None)
+        rec = {
+            "key": request_key(model, messages),
+            "content": resp.choices[0].message.content,
+            "total_tokens": getattr(usage, "total_tokens", 0) or 0,
+        }
+        with _lock:
+            os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+            with open(self._path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        return resp
+
+
+class FakeClient:
+    # 命中录制则原样返回；未录制的请求交给 synthesize 生成确定性响应
+    def __init__(self, fixtures_dir=None, synthesize=None):
+        self.records = load_llm_fixtures(fixtures_dir)
+        self.synthesize = synthesize
+        self.calls = 0
+        self.misses = 0
+        self.chat = SimpleNamespace(completions=_Completions(self._create))
+
+    def _create(self, model, messages, **kwargs):
+        with _lock:
+            self.calls += 1
+        rec = self.records.get(request_key(model, messages))
+        if rec is not None:
+            return make_response(rec["content"], rec.get("total_tokens", 0))
+        with _lock:
+            self.misses += 1
+        if self.synthesize is None:
+            raise KeyError("no recorded LLM response for request")
+        return make_response(self.synthesize(messages), 0)
+
+
+def wrap_client(client):
+    if REPLAY_MODE == "replay":
+        return FakeClient()
+    if REPLAY_MODE == "record" and client is not None:
+        return RecordingClient(client)
+    return client
@@ -0,0 +1,141 @@
+import os
+import io
+import json
+import time
+import pstats
+import cProfile
+import tracemalloc
+from contextlib import contextmanager
+
+from atomic_io import atomic_output
+from http_cache import CACHE_DIR
+
+# ==========================================
+# 运行报告：分阶段计时、信源指标与历史趋势
+# ==========================================
+RUN_REPORT_PATH = os.environ.get("RUN_REPORT_PATH", "run_report.json")
+RUN_HISTORY_PATH = os.path.join(CACHE_DIR, "run_history.jsonl")
+RUN_HISTORY_KEEP = 30
+# PROFILE=cprofile 或 PROFILE=tracemalloc 时对整次运行做剖析
+PROFILE_MODE = os.environ.get("PROFILE", "").strip().lower()
+PROFILE_OUTPUT = os.environ.get("PROFILE_OUTPUT", "run_profile.prof")
+
+
+def new_report():
+    return {
+        "started_at": round(time.time(), 3),
+        "stages": {},
+        "counters": {},
+        "sources": [],
+        "llm": {},
+    }
+
+
+@contextmanager
+def stage(report, name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        report["stages"][name] = round(report["stages"].get(name, 0.0) + time.perf_counter() - start, 4)
+
+
+def count(report, name, value):
+    report["counters"][name] = report["counters"].get(name, 0) + value
+
+
+def record_sources(report, source_health):
+    keys = (
+        "category", "source", "ok", "count", "entries", "bytes", "wire_bytes", "cache_hit", "skipped", "next_poll",
+        "elapsed", "error",
+    )
+    report["sources"] = [{k: s.get(k) for k in keys} for s in source_health]
+    count(report, "bytes_downloaded", sum(s.get("bytes") or 0 for s in source_health))
+    count(report, "wire_bytes_downloaded", sum(s.get("wire_bytes") or 0 for s in source_health))
+    count(report, "entries_parsed", sum(s.get("entries") or 0 for s in source_health))
+    count(report, "http_cache_hits", sum(1 for s in source_health if s.get("cache_hit")))
+    count(report, "sources_skipped", sum(1 for s in source_health if s.get("skipped")))
+
+
+def record_llm(report, stats, percentile):
+    lat = stats["latencies"]
+    report["llm"] = {k: v for k, v in stats.items() if k != "latencies"}
+    report["llm"].update(
+        {
+            "latency_p50": round(percentile(lat, 50), 3),
+            "latency_p90": round(percentile(lat, 90), 3),
+            "latency_p99": round(percentile(lat, 99), 3),
+        }
+    )
+
+
+def load_history(path=None):
+    path = path or RUN_HISTORY_PATH
+    rows = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return rows[-RUN_HISTORY_KEEP:]
+
+
+def history_row(report):
+    return {
+        "started_at": report["started_at"],
+        "total": report.get("total", 0.0),
+        "stages": report["stages"],
+        "items": report["counters"].get("items_rendered", 0),
+        "bytes": report["counters"].get("bytes_downloaded", 0),
+        "cache_hits": report["counters"].get("http_cache_hits", 0),
+        "llm_calls": report["llm"].get("calls", 0),
+    }
+
+
+def finish(report, path=None, history_path=None):
+    report["total"] = round(time.time() - report["started_at"], 3)
+    path = path or RUN_REPORT_PATH
+    history_path = history_path or RUN_HISTORY_PATH
+    try:
+        with atomic_output(path) as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        rows = load_history(history_path)[-(RUN_HISTORY_KEEP - 1):] + [history_row(report)]
+        with atomic_output(history_path) as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"[WARN] run report write failed: {e}")
+
+
+def format_stages(report):
+    return " ".join(f"{name}={secs:.2f}s" for name, secs in report["stages"].items())
+
+
+def run_profiled(fn, mode=None):
+    mode = PROFILE_MODE if mode is None else mode
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(fn)
+        finally:
+            profiler.dump_stats(PROFILE_OUTPUT)
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(25)
+            print(out.getvalue())
+            print(f"[INFO] cProfile stats written to {PROFILE_OUTPUT}")
+    if mode == "tracemalloc":
+        tracemalloc.start(10)
+        try:
+            return fn()
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"[INFO] tracemalloc peak: {peak / 1e6:.1f}MB")
+            for stat in snapshot.statistics("lineno")[:15]:
+                print(f"    {stat}")
+    return fn()
@@ -0,0 +1,133 @@
+import os
+import json
+
+from atomic_io import atomic_output
+from http_cache import CACHE_DIR
+
+# ==========================================
+# 自适应轮询：按信源记录最近成功时间、平均发文间隔与连续失败次数
+# 高频信源更常抓取，持续失败的信源指数退避，单次运行与常驻模式共用
+# ==========================================
+SCHEDULE_PATH = os.path.join(CACHE_DIR, "schedule.json")
+# 正常信源的轮询间隔 = 平均发文间隔 × 系数，并限制在上下限之间（秒）
+POLL_INTERVAL_FACTOR = 0.5
+POLL_MIN_INTERVAL = int(os.environ.get("POLL_MIN_MINUTES", "15")) * 60
+POLL_MAX_INTERVAL = int(os.environ.get("POLL_MAX_HOURS", "24")) * 3600
+# 失败退避：第 n 次连续失败后等待 BASE × 2^n，最长 CAP
+FAILURE_BACKOFF_BASE = 1800
+FAILURE_BACKOFF_CAP = int(os.environ.get("POLL_BACKOFF_CAP_HOURS", "168")) * 3600
+# 距到期不足宽限期的信源本次也抓取，避免定时任务的启动延迟让信源整轮错过；
+# 宽限期取固定下限与轮询间隔一定比例中的较大者（24 小时间隔的信源可提前 6 小时）
+SCHEDULE_GRACE = int(os.environ.get("SCHEDULE_GRACE_MINUTES", "30")) * 60
+SCHEDULE_GRACE_FRACTION = float(os.environ.get("SCHEDULE_GRACE_FRACTION", "0.25"))
+# 平均发文间隔的平滑系数（新观测所占权重）
+INTERVAL_SMOOTHING = 0.5
+# 估算发文间隔时最多参考的最近条目数
+INTERVAL_SAMPLE = 20
+
+
+def load_state(path=None):
+    try:
+        with open(path or SCHEDULE_PATH, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return state if isinstance(state, dict) else {}
+
+
+def save_state(state, path=None):
+    with atomic_output(path or SCHEDULE_PATH) as f:
+        json.dump(state, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def post_interval(timestamps, now):
+    # 最近若干条的平均间隔；信源沉寂时以距最新一条的时长为下限
+    stamps = sorted(timestamps, reverse=True)[:INTERVAL_SAMPLE]
+    if not stamps:
+        return None
+    since_newest = max(0, now - stamps[0])
+    if len(stamps) < 2:
+        return since_newest or None
+    return max((stamps[0] - stamps[-1]) / (len(stamps) - 1), since_newest)
+
+
+def next_interval(entry):
+    failures = entry.get("failures", 0)
+    if failures:
+        return min(FAILURE_BACKOFF_BASE * 2 ** failures, FAILURE_BACKOFF_CAP)
+    avg = entry.get("avg_interval")
+    if not avg:
+        return POLL_MIN_INTERVAL
+    return int(min(max(avg * POLL_INTERVAL_FACTOR, POLL_MIN_INTERVAL), POLL_MAX_INTERVAL))
+
+
+def grace_period(entry):
+    interval = entry.get("next_poll", 0) - entry["last_poll"] if entry.get("last_poll") else 0
+    return max(SCHEDULE_GRACE, SCHEDULE_GRACE_FRACTION * interval)
+
+
+def is_due(entry, now, grace=None):
+    if entry is None:
+        return True
+    grace = grace_period(entry) if grace is None else grace
+    return entry.get("next_poll", 0) - now <= grace
+
+
+def due_urls(sources, state, now, grace=None):
+    # 返回本次需要抓取的 URL 集合；未出现在状态中的新信源总是到期
+    return {
+        url
+        for feeds in sources.values()
+        for url in feeds.values()
+        if is_due(state.get(url), now, grace)
+    }
+
+
+def is_failure(status):
+    # 抓取抛错或一条条目都没有（如失效的桥接/占位源）计为失败；窗口内无新条目不算
+    return not status.get("entries")
+
+
+def record_poll(state, status, now):
+    entry = state.setdefault(status["url"], {"failures": 0})
+    entry["last_poll"] = int(now)
+    if is_failure(status):
+        entry["failures"] = entry.get("failures", 0) + 1
+        entry["error"] = status.get("error") or "no entries"
+    else:
+        entry["failures"] = 0
+        entry["last_success"] = int(now)
+        entry.pop("error", None)
+        observed = status.get("post_interval")
+        if observed:
+            prev = entry.get("avg_interval")
+            avg = observed if not prev else prev + INTERVAL_SMOOTHING * (observed - prev)
+            entry["avg_interval"] = int(avg)
+    entry["next_poll"] = int(now + next_interval(entry))
+    return entry
+
+
+def update(state, source_health, now):
+    # 只更新本次实际抓取的信源；所有状态行都补上下次抓取时间供健康表展示
+    for status in source_health:
+        if status.get("skipped"):
+            entry = state.get(status["url"]) or {}
+            # 跳过的信源展示上次失败原因
+            status["error"] = entry.get("error") or status["error"]
+        else:
+            entry = record_poll(state, status, now)
+        status["next_poll"] = entry.get("next_poll")
+        status["failures"] = entry.get("failures", 0)
+    return state
+
+
+def next_wakeup(state, sources, now):
+    # 常驻模式下到下一个信源到期还需等待的秒数
+    pending = [
+        state[url].get("next_poll", now) if url in state else now
+        for feeds in sources.values()
+        for url in feeds.values()
+    ]
+    if not pending:
+        return POLL_MAX_INTERVAL
+    return max(0, min(pending) - now)
@@ -0,0 +1,163 @@
+import os
+import json
+import gzip
+import glob
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import main
+import replay
+import run_report
+import scheduler
+from atomic_io import atomic_output
+from items import make_item
+
+# ==========================================
+# 分片运行：按 URL 哈希把信源分到多个进程或多台机器，各分片只负责抓取与解析
+# 分片结果以紧凑格式输出，合并步骤统一去重、摘要并渲染一次，结果与单进程运行一致
+# 多机模式（--shard）下各机器没有合并方的调度状态，总是抓取本分片的全部信源
+# ==========================================
+SHARD_PROCESSES = int(os.environ.get("SHARD_PROCESSES", str(os.cpu_count() or 1)))
+# 分片条目按固定列顺序存为数组，省去每条重复的键名
+ITEM_FIELDS = ("id", "category", "source", "title", "link", "ts", "date_str", "raw_summary", "is_video", "undated")
+
+
+def shard_of(url, shards):
+    # 稳定哈希：同一信源在不同机器、不同运行中总落在同一分片
+    return int(hashlib.sha1(url.encode("utf-8")).hexdigest()[:8], 16) % shards
+
+
+def shard_sources(sources, shard, shards):
+    return {
+        category: {source: url for source, url in feeds.items() if shard_of(url, shards) == shard}
+        for category, feeds in sources.items()
+    }
+
+
+def job_order(sources):
+    # 单进程运行时的抓取顺序（分类顺序 + 信源顺序），合并时按此还原
+    return {
+        (category, source): idx
+        for idx, (category, source) in enumerate(
+            (category, source) for category in main.CATEGORY_ORDER for source in sources.get(category, {})
+        )
+    }
+
+
+def fetch_shard(shard, shards, now_ts, scheduled=None):
+    now = datetime.fromtimestamp(now_ts)
+    time_limit = now - timedelta(days=7)
+    sources = shard_sources(main.RSS_SOURCES, shard, shards)
+    skip = frozenset()
+    scheduled = main.scheduling_enabled() if scheduled is None else scheduled
+    if scheduled:
+        # 本机进程池与合并方共用 .cache；分片只读取调度状态，
+        # 抓取结果由合并步骤统一回写，避免多进程同时写文件
+        state = scheduler.load_state()
+        due = scheduler.due_urls(sources, state, now_ts)
+        skip = {url for feeds in sources.values() for url in feeds.values() if url not in due}
+    start = time.perf_counter()
+    items, health = main.fetch_all_sources(time_limit, sources=sources, skip=skip)
+    return {
+        "shard": shard,
+        "shards": shards,
+        "now": now_ts,
+        "elapsed": round(time.perf_counter() - start, 4),
+        "items": [[item[f] for f in ITEM_FIELDS] for item in items],
+        "health": health,
+    }
+
+
+def partial_path(out_dir, shard, shards):
+    return os.path.join(out_dir, f"shard-{shard:03d}-of-{shards:03d}.json.gz")
+
+
+def write_partial(partial, out_dir):
+    path = partial_path(out_dir, partial["shard"], partial["shards"])
+    with atomic_output(path, "wt", opener=gzip.open, compresslevel=6) as f:
+        json.dump(partial, f, ensure_ascii=False, separators=(",", ":"))
+    return path
+
+
+def load_partials(out_dir):
+    partials = []
+    for path in sorted(glob.glob(os.path.join(out_dir, "shard-*-of-*.json.gz"))):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            partials.append(json.load(f))
+    if not partials:
+        raise FileNotFoundError(f"no shard outputs in {out_dir}")
+    shards = partials[0]["shards"]
+    found = {p["shard"] for p in partials if p["shards"] == shards}
+    missing = sorted(set(range(shards)) - found)
+    if missing or len(found) != len(partials):
+        raise ValueError(f"incomplete shard set in {out_dir}: expected {shards}, missing {missing}")
+    return partials
+
+
+def merge(partials, output_path="index.html", ctx=None):
+    order = job_order(main.RSS_SOURCES)
+    items = [make_item(**dict(zip(ITEM_FIELDS, row))) for p in partials for row in p["items"]]
+    health = [status for p in partials for status in p["health"]]
+    # 稳定排序：同一信源内保持原有条目顺序，信源之间还原单进程的抓取顺序
+    items.sort(key=lambda item: order.get((item["category"], item["source"]), len(order)))
+    health.sort(key=lambda status: order.get((status["category"], status["source"]), len(order)))
+    # 所有分片共用协调方给出的时间基准
+    now_ts = min(p["now"] for p in partials)
+
+    owns_ctx = ctx is None
+    ctx = main.open_context() if owns_ctx else ctx
+    try:
+        if main.scheduling_enabled():
+            scheduler.update(ctx["schedule"], health, now_ts)
+            scheduler.save_state(ctx["schedule"])
+        report = run_report.new_report()
+        report["stages"]["fetch"] = max(p["elapsed"] for p in partials)
+        report["counters"]["shards"] = len(partials)
+        return main.process_items(ctx, report, items, health, datetime.fromtimestamp(now_ts), output_path)
+    finally:
+        if owns_ctx:
+            main.close_context(ctx)
+
+
+def run_pool(processes=None, output_path="index.html"):
+    processes = SHARD_PROCESSES if processes is None else processes
+    if replay.REPLAY_MODE == "record":
+        # 录制索引由单进程维护，录制时不并行写入
+        processes = 1
+    now_ts = time.time()
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        partials = list(pool.map(fetch_shard, range(processes), [processes] * processes, [now_ts] * processes))
+    return merge(partials, output_path)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="seo-news-monitor sharded run")
+    parser.add_argument("--output", default="index.html")
+    parser.add_argument("--processes", type=int, default=SHARD_PROCESSES, help="process pool size for a local run")
+    parser.add_argument(
+        "--shard",
+        help="fetch only shard I/N and write its partial output (multi-machine mode; "
+        "the adaptive scheduler is off here because only the merge host holds the schedule state)",
+    )
+    parser.add_argument("--now", type=float, help="shared timestamp for all shards of one run (default: now)")
+    parser.add_argument("--merge", action="store_true", help="merge partial outputs from --dir and render")
+    parser.add_argument("--dir", default="shards", help="directory for partial shard outputs")
+    args = parser.parse_args()
+
+    if args.shard:
+        shard, shards = (int(x) for x in args.shard.split("/"))
+        # 其他机器上的调度状态与 HTTP 缓存可能早已过期，按是否到期跳过会让合并结果偏离单进程运行
+        partial = fetch_shard(shard, shards, args.now or time.time(), scheduled=False)
+        path = write_partial(partial, args.dir)
+        print(f"[OK] shard {shard}/{shards}: {len(partial['items'])} items -> {path}")
+    elif args.merge:
+        merge(load_partials(args.dir), args.output)
+    else:
+        run_pool(args.processes, args.output)
+
+
+if __name__ == "__main__":
+    main_cli()
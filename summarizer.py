@@ -0,0 +1,206 @@
+import os
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# ==========================================
+# 摘要阶段：并发 + 令牌桶限流 + 退避重试 + 单次运行预算
+# ==========================================
+LLM_CONCURRENCY = int(os.environ.get("LLM_CONCURRENCY", "4"))
+LLM_RPM = float(os.environ.get("LLM_RPM", "60"))
+LLM_TPM = float(os.environ.get("LLM_TPM", "60000"))
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", "4"))
+# 批量模式：每个请求打包 K 条资讯（1 表示关闭）
+LLM_BATCH_SIZE = int(os.environ.get("LLM_BATCH_SIZE", "1"))
+# 单次运行硬预算：超出后改用 fallback_cn_summary，不再请求模型
+LLM_BUDGET_CALLS = int(os.environ.get("LLM_BUDGET_CALLS", "300"))
+LLM_BUDGET_TOKENS = int(os.environ.get("LLM_BUDGET_TOKENS", "300000"))
+
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+
+
+class TokenBucket:
+    def __init__(self, per_minute, capacity=None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, amount=1):
+        if self.rate <= 0:
+            return
+        amount = min(amount, self.capacity)
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def is_retryable(exc):
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    # 连接中断 / 超时类异常没有状态码，同样视为瞬时错误
+    return type(exc).__name__ in ("APIConnectionError", "APITimeoutError", "TimeoutError", "ConnectionError")
+
+
+def retry_delay(exc, attempt):
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        retry_after = float(headers.get("retry-after"))
+        return min(BACKOFF_CAP, retry_after)
+    except (TypeError, ValueError):
+        pass
+    # full jitter 指数退避
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def new_stats():
+    return {
+        "items": 0,
+        "calls": 0,
+        "batches": 0,
+        "batch_retried": 0,
+        "retries": 0,
+        "failures": 0,
+        "fallbacks": 0,
+        "budget_exhausted": False,
+        "tokens": 0,
+        "latencies": [],
+    }
+
+
+def format_stats(stats):
+    lat = stats["latencies"]
+    batch = f"batches={stats['batches']} batch_retried={stats['batch_retried']} " if stats["batches"] else ""
+    return (
+        f"items={stats['items']} calls={stats['calls']} {batch}retries={stats['retries']} "
+        f"failures={stats['failures']} fallbacks={stats['fallbacks']} tokens={stats['tokens']} "
+        f"p50={percentile(lat, 50):.2f}s p90={percentile(lat, 90):.2f}s p99={percentile(lat, 99):.2f}s"
+        + (" [budget exhausted]" if stats["budget_exhausted"] else "")
+    )
+
+
+def run_summaries(
+    items,
+    call,
+    fallback,
+    estimate_tokens=lambda item: 1000,
+    call_batch=None,
+    estimate_batch_tokens=None,
+    batch_size=None,
+    concurrency=None,
+    rpm=None,
+    tpm=None,
+    max_retries=None,
+    budget_calls=None,
+    budget_tokens=None,
+    sleep=time.sleep,
+):
+    # call(item) -> (summary 或 None, 实际 token 数)，API 错误直接抛出
+    # call_batch(items) -> ({id: summary}, 实际 token 数)，缺失或未通过校验的条目会单独重试
+    # 返回与 items 对齐的 [(summary, from_ai)] 以及统计信息
+    concurrency = LLM_CONCURRENCY if concurrency is None else concurrency
+    max_retries = LLM_MAX_RETRIES if max_retries is None else max_retries
+    budget_calls = LLM_BUDGET_CALLS if budget_calls is None else budget_calls
+    budget_tokens = LLM_BUDGET_TOKENS if budget_tokens is None else budget_tokens
+    batch_size = LLM_BATCH_SIZE if batch_size is None else batch_size
+    if call_batch is None:
+        batch_size = 1
+    estimate_batch_tokens = estimate_batch_tokens or (lambda chunk: sum(estimate_tokens(i) for i in chunk))
+    rpm_bucket = TokenBucket(LLM_RPM if rpm is None else rpm)
+    tpm_bucket = TokenBucket(LLM_TPM if tpm is None else tpm)
+    stats = new_stats()
+    stats["items"] = len(items)
+    lock = threading.Lock()
+
+    def reserve(estimate):
+        with lock:
+            if stats["calls"] >= budget_calls or stats["tokens"] + estimate > budget_tokens:
+                stats["budget_exhausted"] = True
+                return False
+            stats["calls"] += 1
+            stats["tokens"] += estimate
+            return True
+
+    def call_with_retries(fn, unit, estimate, label):
+        for attempt in range(max_retries + 1):
+            if not reserve(estimate):
+                return None
+            rpm_bucket.acquire(1)
+            tpm_bucket.acquire(estimate)
+            start = time.monotonic()
+            try:
+                result, used = fn(unit)
+            except Exception as e:
+                # 失败的请求按预估 token 计入预算
+                retry = attempt < max_retries and is_retryable(e)
+                with lock:
+                    stats["retries" if retry else "failures"] += 1
+                if retry:
+                    sleep(retry_delay(e, attempt))
+                    continue
+                print(f"[WARN] AI summary failed: {label} -> {e}")
+                return None
+            with lock:
+                stats["latencies"].append(time.monotonic() - start)
+                if used:
+                    stats["tokens"] += used - estimate
+                if result is None:
+                    stats["failures"] += 1
+            return result
+        return None
+
+    def run_one(item):
+        summary = call_with_retries(call, item, estimate_tokens(item), item["title"][:60])
+        if summary is not None:
+            return summary, True
+        with lock:
+            stats["fallbacks"] += 1
+        return fallback(item), False
+
+    def run_batch(chunk):
+        if len(chunk) == 1:
+            return [run_one(chunk[0])]
+        with lock:
+            stats["batches"] += 1
+        got = call_with_retries(call_batch, chunk, estimate_batch_tokens(chunk), f"batch of {len(chunk)}") or {}
+        out = []
+        for item in chunk:
+            summary = got.get(item["id"])
+            if summary is not None:
+                out.append((summary, True))
+                continue
+            with lock:
+                stats["batch_retried"] += 1
+            out.append(run_one(item))
+        return out
+
+    if not items:
+        return [], stats
+    size = max(1, batch_size)
+    chunks = [items[i:i + size] for i in range(0, len(items), size)]
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(chunks)))) as pool:
+        for out in pool.map(run_batch, chunks):
+            results.extend(out)
+    return results, stats
@@ -0,0 +1,97 @@
+import os
+import json
+import time
+import hashlib
+
+from atomic_io import atomic_output
+from http_cache import CACHE_DIR
+
+# ==========================================
+# AI 摘要缓存：按条目 id + 内容哈希 + 提示词版本寻址，避免重复调用模型
+# ==========================================
+SUMMARY_CACHE_PATH = os.path.join(CACHE_DIR, "summaries.jsonl")
+# 超过保留期未被使用的摘要会在加载时淘汰
+SUMMARY_RETENTION_DAYS = int(os.environ.get("SUMMARY_RETENTION_DAYS", "14"))
+
+
+def summary_key(item, prompt_version):
+    seed = "\x1f".join(
+        [
+            str(prompt_version),
+            item["id"],
+            item.get("title") or "",
+            str(item.get("raw_summary") or ""),
+        ]
+    )
+    return hashlib.sha256(seed.encode("utf-8")).hexdigest()
+
+
+def load_store(path=None, retention_days=None):
+    path = path or SUMMARY_CACHE_PATH
+    retention_days = SUMMARY_RETENTION_DAYS if retention_days is None else retention_days
+    cutoff = time.time() - retention_days * 86400
+    store = {"path": path, "records": {}, "dirty": False, "hits": 0, "misses": 0}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    store["dirty"] = True
+                    continue
+                if rec.get("seen_at", 0) < cutoff:
+                    store["dirty"] = True
+                    continue
+                if rec["key"] in store["records"]:
+                    store["dirty"] = True
+                store["records"][rec["key"]] = rec
+    except OSError:
+        pass
+    return store
+
+
+def start_run(store, retention_days=None):
+    # 常驻模式下同一份缓存跨轮复用：清零命中计数，并淘汰超过保留期的记录
+    retention_days = SUMMARY_RETENTION_DAYS if retention_days is None else retention_days
+    cutoff = time.time() - retention_days * 86400
+    expired = [key for key, rec in store["records"].items() if rec.get("seen_at", 0) < cutoff]
+    for key in expired:
+        del store["records"][key]
+    store["dirty"] = store["dirty"] or bool(expired)
+    store["hits"] = 0
+    store["misses"] = 0
+
+
+def lookup(store, item, prompt_version):
+    rec = store["records"].get(summary_key(item, prompt_version))
+    if rec is None:
+        store["misses"] += 1
+        return None
+    store["hits"] += 1
+    rec["seen_at"] = int(time.time())
+    store["dirty"] = True
+    return rec["summary"]
+
+
+def remember(store, item, prompt_version, summary):
+    key = summary_key(item, prompt_version)
+    store["records"][key] = {
+        "key": key,
+        "id": item["id"],
+        "summary": summary,
+        "seen_at": int(time.time()),
+    }
+    store["dirty"] = True
+
+
+def save_store(store):
+    if not store["dirty"]:
+        return
+    path = store["path"]
+    try:
+        with atomic_output(path) as f:
+            for rec in store["records"].values():
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        store["dirty"] = False
+    except OSError as e:
+        print(f"[WARN] summary cache write failed: {path} -> {e}")
@@ -0,0 +1,77 @@
+import re
+import html
+import hashlib
+import threading
+
+# ==========================================
+# 正文清洗：去标签、反转义、压缩空白
+# 预编译正则 + 按需截断 + 按内容缓存（同一条目会被摘要、回退摘要、聚类多次调用）
+# ==========================================
+TAG_RE = re.compile("<.*?>")
+SPACE_RE = re.compile(r"\s+")
+# 实体引用不会跨越这些字符，在其后截断不会改变反转义结果
+ENTITY_BREAK_RE = re.compile(r"[\t\n\f ]")
+
+# 截断时先取输出上限的若干倍输入，不够再放大
+TRUNCATE_FACTOR = 8
+# 按内容哈希缓存，不持有原始 HTML；短文本直接计算比哈希更快
+NORMALIZE_CACHE_SIZE = 8192
+NORMALIZE_CACHE_MIN_LEN = 512
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _normalize(text):
+    text = TAG_RE.sub("", text)
+    text = html.unescape(text)
+    return SPACE_RE.sub(" ", text).strip()
+
+
+def _safe_prefix(text, budget):
+    # 标签正则不跨行，换行之后截断对去标签和反转义都安全
+    cut = text.find("\n", budget)
+    if cut >= 0:
+        return _normalize(text[:cut + 1])
+    # 单行长 HTML：先整体去标签，再在空白处截断后反转义
+    stripped = TAG_RE.sub("", text)
+    if len(stripped) <= budget:
+        return None
+    match = ENTITY_BREAK_RE.search(stripped, budget)
+    if match is None:
+        return None
+    return SPACE_RE.sub(" ", html.unescape(stripped[:match.end()])).strip()
+
+
+def _normalize_limited(text, limit):
+    if limit is None:
+        return _normalize(text)
+    budget = max(limit * TRUNCATE_FACTOR, 1024)
+    while budget < len(text):
+        prefix = _safe_prefix(text, budget)
+        # 截断后的结果已经足够长时，它就是完整结果的前缀
+        if prefix is not None and len(prefix) >= limit:
+            return prefix[:limit]
+        budget *= 4
+    return _normalize(text)[:limit]
+
+
+def normalize_text(raw, limit=None):
+    # 等价于旧实现的 normalize_text(raw)[:limit]
+    if not raw:
+        return ""
+    if isinstance(raw, list):
+        raw = raw[0].get("value", "")
+    text = str(raw)
+    if len(text) < NORMALIZE_CACHE_MIN_LEN:
+        return _normalize_limited(text, limit)
+    key = (hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest(), limit)
+    result = _cache.get(key)
+    if result is None:
+        result = _normalize_limited(text, limit)
+        with _cache_lock:
+            if len(_cache) >= NORMALIZE_CACHE_SIZE:
+                # 按插入顺序淘汰最早的条目
+                _cache.pop(next(iter(_cache)))
+            _cache[key] = result
+    return result